@@ -0,0 +1,213 @@
+""" Multicast DNS Service Discovery for Python, v0.14-wmcbrine
+    Copyright 2003 Paul Scott-Murphy, 2014 William McBrine
+
+    This module provides a framework for the use of DNS Service Discovery
+    using IP multicast.
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation; either
+    version 2.1 of the License, or (at your option) any later version.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301
+    USA
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import timeit
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from zeroconf import DNSIncoming, DNSOutgoing, DNSPointer, ServiceInfo, __version__
+from zeroconf.asyncio import AsyncZeroconf
+
+from .corpus import CorpusEntry, load_corpus
+
+_BenchmarkType = Callable[[AsyncZeroconf, CorpusEntry], Optional[Callable[[], None]]]
+
+
+class BenchmarkResult(NamedTuple):
+    """Timings for one benchmark against one corpus entry."""
+
+    benchmark: str
+    corpus: str
+    loops: int
+    best: float  # seconds per loop
+    mean: float  # seconds per loop
+
+
+def parse_incoming(aiozc: AsyncZeroconf, entry: CorpusEntry) -> Optional[Callable[[], None]]:
+    """Decode every packet of the entry including all of its records."""
+
+    def _run() -> None:
+        for packet in entry.packets:
+            DNSIncoming(packet).answers
+
+    return _run
+
+
+def outgoing_packets(aiozc: AsyncZeroconf, entry: CorpusEntry) -> Optional[Callable[[], None]]:
+    """Build and encode the packets of the entry from their decoded records."""
+    msgs = [DNSIncoming(packet) for packet in entry.packets]
+
+    def _run() -> None:
+        for msg in msgs:
+            out = DNSOutgoing(msg.flags)
+            for question in msg.questions:
+                out.add_question(question)
+            for i, record in enumerate(msg.answers):
+                if i < msg.num_answers:
+                    out.add_answer_at_time(record, 0)
+                else:
+                    out.add_additional_answer(record)
+            out.packets()
+
+    return _run
+
+
+def query_response(aiozc: AsyncZeroconf, entry: CorpusEntry) -> Optional[Callable[[], None]]:
+    """Answer the query packets of the entry from the registered corpus services."""
+    msgs = [DNSIncoming(packet) for packet in entry.packets]
+    if not msgs[0].is_query():
+        return None
+    query_handler = aiozc.zeroconf.query_handler
+
+    def _run() -> None:
+        query_handler.async_response(msgs, False)
+
+    return _run
+
+
+def updates_from_response(aiozc: AsyncZeroconf, entry: CorpusEntry) -> Optional[Callable[[], None]]:
+    """Process the response packets of the entry into the cache."""
+    msgs = [DNSIncoming(packet) for packet in entry.packets]
+    if msgs[0].is_query():
+        return None
+    record_manager = aiozc.zeroconf.record_manager
+
+    def _run() -> None:
+        for msg in msgs:
+            record_manager.async_updates_from_response(msg)
+
+    return _run
+
+
+BENCHMARKS: List[Tuple[str, _BenchmarkType]] = [
+    ("DNSIncoming", parse_incoming),
+    ("DNSOutgoing.packets", outgoing_packets),
+    ("QueryHandler.async_response", query_response),
+    ("RecordManager.async_updates_from_response", updates_from_response),
+]
+
+
+def _register_corpus_services(aiozc: AsyncZeroconf, corpus: List[CorpusEntry]) -> None:
+    """Register the services announced in the corpus so the queries have answers."""
+    zc = aiozc.zeroconf
+    pointers: List[DNSPointer] = []
+    for entry in corpus:
+        for packet in entry.packets:
+            msg = DNSIncoming(packet)
+            if msg.is_query():
+                continue
+            zc.record_manager.async_updates_from_response(msg)
+            pointers.extend(record for record in msg.answers if isinstance(record, DNSPointer))
+    for pointer in pointers:
+        if zc.registry.async_get_info_name(pointer.alias):
+            continue
+        info = ServiceInfo(pointer.name, pointer.alias)
+        if info.load_from_cache(zc):
+            zc.registry.async_add(info)
+
+
+def _time(func: Callable[[], None], repeat: int) -> Tuple[int, List[float]]:
+    """Time func and return the number of loops and the seconds per loop of each repeat."""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    return loops, [elapsed / loops for elapsed in timer.repeat(repeat, loops)]
+
+
+async def async_run_benchmarks(
+    corpus: List[CorpusEntry], repeat: int, only: Optional[str] = None
+) -> List[BenchmarkResult]:
+    """Run the benchmarks against every corpus entry they apply to."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    await aiozc.zeroconf.async_wait_for_start()
+    _register_corpus_services(aiozc, corpus)
+    results = []
+    try:
+        for name, benchmark in BENCHMARKS:
+            if only and only not in name:
+                continue
+            for entry in corpus:
+                func = benchmark(aiozc, entry)
+                if func is None:
+                    continue
+                loops, timings = _time(func, repeat)
+                results.append(BenchmarkResult(name, entry.name, loops, min(timings), sum(timings) / repeat))
+    finally:
+        await aiozc.async_close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the protocol layer against a packet corpus.")
+    parser.add_argument('--json', help="Write the results as JSON to this file")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of timed repeats per benchmark")
+    parser.add_argument('--only', help="Only run benchmarks whose name contains this string")
+    parser.add_argument('--compare', help="Compare against the JSON results of a previous run")
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.25,
+        help="Exit with an error if a benchmark is this many times slower than in --compare",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run_benchmarks(load_corpus(), args.repeat, args.only))
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as json_file:
+            baseline = {
+                (item['benchmark'], item['corpus']): item['best'] for item in json.load(json_file)['results']
+            }
+
+    regressions = []
+    for result in results:
+        line = f"{result.benchmark:<42} {result.corpus:<28} {result.best * 1e6:>10.2f} us"
+        previous = baseline.get((result.benchmark, result.corpus))
+        if previous:
+            ratio = result.best / previous
+            line += f" {ratio:>6.2f}x"
+            if ratio > args.threshold:
+                regressions.append(result)
+        print(line)
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(
+                {
+                    'zeroconf': __version__,
+                    'python': platform.python_version(),
+                    'implementation': platform.python_implementation(),
+                    'results': [result._asdict() for result in results],
+                },
+                json_file,
+                indent=2,
+            )
+
+    if regressions:
+        sys.exit(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+""" Multicast DNS Service Discovery for Python, v0.14-wmcbrine
+    Copyright 2003 Paul Scott-Murphy, 2014 William McBrine
+
+    This module provides a framework for the use of DNS Service Discovery
+    using IP multicast.
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation; either
+    version 2.1 of the License, or (at your option) any later version.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301
+    USA
+"""
+
+import json
+import os
+import socket
+from typing import Dict, List, NamedTuple
+
+from zeroconf import DNSHinfo, DNSNsec, DNSOutgoing, DNSQuestion, DNSText, ServiceInfo
+from zeroconf.const import (
+    _CLASS_IN,
+    _CLASS_UNIQUE,
+    _FLAGS_AA,
+    _FLAGS_QR_QUERY,
+    _FLAGS_QR_RESPONSE,
+    _TYPE_A,
+    _TYPE_AAAA,
+    _TYPE_HINFO,
+    _TYPE_NSEC,
+    _TYPE_PTR,
+    _TYPE_SRV,
+    _TYPE_TXT,
+)
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'corpus.json')
+
+
+class CorpusEntry(NamedTuple):
+    """A named set of packets that belong together."""
+
+    name: str
+    description: str
+    packets: List[bytes]
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[CorpusEntry]:
+    """Load the checked in packet corpus."""
+    with open(path) as corpus_file:
+        entries = json.load(corpus_file)
+    return [
+        CorpusEntry(
+            entry['name'], entry['description'], [bytes.fromhex(packet) for packet in entry['packets']]
+        )
+        for entry in entries
+    ]
+
+
+def _service(type_: str, name: str, server: str, port: int, properties: Dict, address: str) -> ServiceInfo:
+    return ServiceInfo(
+        type_,
+        f"{name}.{type_}",
+        port,
+        0,
+        0,
+        properties,
+        server,
+        addresses=[socket.inet_aton(address)],
+    )
+
+
+def _add_service(out: DNSOutgoing, info: ServiceInfo) -> None:
+    out.add_answer_at_time(info.dns_pointer(), 0)
+    out.add_answer_at_time(info.dns_service(), 0)
+    out.add_answer_at_time(info.dns_text(), 0)
+    for record in info.dns_addresses():
+        out.add_additional_answer(record)
+
+
+def _apple_device_info() -> DNSOutgoing:
+    server = "Office-MacBook-Pro.local."
+    airplay = _service(
+        "_airplay._tcp.local.",
+        "Office MacBook Pro",
+        server,
+        7000,
+        {
+            'acl': '0',
+            'deviceid': 'A0:78:17:6B:1C:5D',
+            'features': '0x5A7FFEE6,0x1E',
+            'fex': '5n+/Rgc',
+            'flags': '0x4',
+            'gid': '8D5E1A0C-2D57-4B16-9B8A-6D1D2C6D54F3',
+            'igl': '1',
+            'model': 'MacBookPro16,1',
+            'osvers': '12.3.1',
+            'pi': 'B9C1D6F4-4F2A-4A07-8A0E-3B3C2A2C8B4F',
+            'pk': 'c4a9bb9e4e05e8e92d7c12bfb0a9d2ab8aa0d9a0ba5dbd3a1de4a8b8f2d5a4e1',
+            'protovers': '1.1',
+            'psi': '62A4D1D4-6C11-4B8B-96E7-44E1D62F1E25',
+            'srcvers': '620.8.2',
+            'vv': '2',
+        },
+        '192.168.1.23',
+    )
+    raop = _service(
+        "_raop._tcp.local.",
+        "A078176B1C5D@Office MacBook Pro",
+        server,
+        7000,
+        {
+            'cn': '0,1,2,3',
+            'da': 'true',
+            'et': '0,3,5',
+            'ft': '0x5A7FFEE6,0x1E',
+            'am': 'MacBookPro16,1',
+            'md': '0,1,2',
+            'sf': '0x4',
+            'tp': 'UDP',
+            'vn': '65537',
+            'vs': '620.8.2',
+            'vv': '2',
+        },
+        '192.168.1.23',
+    )
+    out = DNSOutgoing(_FLAGS_QR_RESPONSE | _FLAGS_AA)
+    _add_service(out, airplay)
+    _add_service(out, raop)
+    out.add_answer_at_time(
+        DNSText(
+            "Office MacBook Pro._device-info._tcp.local.",
+            _TYPE_TXT,
+            _CLASS_IN,
+            4500,
+            b'\x13model=MacBookPro16,1\x0bosxvers=21\x08ecolor=157,157,160',
+        ),
+        0,
+    )
+    out.add_additional_answer(
+        DNSHinfo(server, _TYPE_HINFO, _CLASS_IN | _CLASS_UNIQUE, 4500, 'ARM64', 'MACOS')
+    )
+    out.add_additional_answer(
+        DNSNsec(server, _TYPE_NSEC, _CLASS_IN | _CLASS_UNIQUE, 120, server, [_TYPE_A, _TYPE_AAAA])
+    )
+    for info in (airplay, raop):
+        out.add_additional_answer(
+            DNSNsec(info.name, _TYPE_NSEC, _CLASS_IN | _CLASS_UNIQUE, 4500, info.name, [_TYPE_TXT, _TYPE_SRV])
+        )
+    return out
+
+
+def _large_txt() -> DNSOutgoing:
+    properties = {
+        'txtvers': '1',
+        'qtotal': '1',
+        'rp': 'ipp/print',
+        'ty': 'HP LaserJet Pro MFP M428fdw',
+        'product': '(HP LaserJet Pro MFP M428fdw)',
+        'usb_MFG': 'HP',
+        'usb_MDL': 'HP LaserJet Pro MFP M428fdw',
+        'priority': '10',
+        'adminurl': 'http://NPI8F2A31.local./#hId-pgAirPrint',
+        'note': 'Second floor, next to the kitchen',
+        'pdl': 'application/octet-stream,application/pdf,application/postscript,image/jpeg,image/urf,'
+        'image/pwg-raster,application/PCLm',
+        'Color': 'F',
+        'Duplex': 'T',
+        'Fax': 'T',
+        'Scan': 'T',
+        'Copies': 'T',
+        'Collate': 'T',
+        'PaperMax': 'legal-A4',
+        'kind': 'document,envelope,label,postcard',
+        'URF': 'V1.4,CP99,W8,OB10,PQ3-4-5,ADOBERGB24,DEVRGB24,DEVW8,SRGB24,DM1,IS1,MT1-2-3-5-12,RS300-600',
+        'UUID': '564e4333-4631-3630-3232-a0b3cc8f2a31',
+        'TLS': '1.2',
+        'mopria-certified': '2.0',
+        'print_wfds': 'T',
+        'Transparent': 'T',
+        'Binary': 'T',
+        'TBCP': 'F',
+        'PaperCustom': 'T',
+        'air': 'username,password',
+        'Staple': 'F',
+        'Punch': '0',
+        'Sort': 'T',
+        'Bind': 'F',
+        'rfo': 'ipp/faxout',
+    }
+    info = _service(
+        "_ipp._tcp.local.", "HP LaserJet Pro MFP M428fdw", "NPI8F2A31.local.", 631, properties, '192.168.1.40'
+    )
+    out = DNSOutgoing(_FLAGS_QR_RESPONSE | _FLAGS_AA)
+    _add_service(out, info)
+    return out
+
+
+def _multi_packet_known_answers() -> DNSOutgoing:
+    out = DNSOutgoing(_FLAGS_QR_QUERY, multicast=True)
+    for type_ in ("_http._tcp.local.", "_hap._tcp.local.", "_airplay._tcp.local."):
+        out.add_question(DNSQuestion(type_, _TYPE_PTR, _CLASS_IN))
+    for i in range(120):
+        type_ = "_hap._tcp.local." if i % 2 else "_http._tcp.local."
+        info = _service(
+            type_, f"Living Room Accessory {i:03d}", f"accessory-{i:03d}.local.", 80, {}, '10.0.0.1'
+        )
+        out.add_answer_at_time(info.dns_pointer(), 0)
+    return out
+
+
+def _compression_heavy() -> DNSOutgoing:
+    out = DNSOutgoing(_FLAGS_QR_RESPONSE | _FLAGS_AA)
+    for i in range(12):
+        info = _service(
+            "_hap._tcp.local.",
+            f"Hue Bridge Accessory {i:02d}",
+            "Philips-Hue-Bridge.local.",
+            8080 + i,
+            {
+                'c#': str(i + 1),
+                'ff': '0',
+                'id': f'AB:CD:EF:01:02:{i:02X}',
+                'md': 'BSB002',
+                's#': '1',
+                'sf': '0',
+            },
+            '192.168.1.50',
+        )
+        _add_service(out, info)
+    return out
+
+
+def _simple_query() -> DNSOutgoing:
+    out = DNSOutgoing(_FLAGS_QR_QUERY, multicast=True)
+    out.add_question(DNSQuestion("_hap._tcp.local.", _TYPE_PTR, _CLASS_IN))
+    out.add_question(DNSQuestion("Philips-Hue-Bridge.local.", _TYPE_A, _CLASS_IN))
+    out.add_question(DNSQuestion("Philips-Hue-Bridge.local.", _TYPE_AAAA, _CLASS_IN))
+    return out
+
+
+def generate_corpus() -> List[CorpusEntry]:
+    """Generate the packet corpus."""
+    return [
+        CorpusEntry(
+            "apple_device_info",
+            "A Mac answering for AirPlay and RAOP with device info, HINFO and NSEC records.",
+            _apple_device_info().packets(),
+        ),
+        CorpusEntry(
+            "large_txt",
+            "A printer announcing an IPP service with a large TXT record.",
+            _large_txt().packets(),
+        ),
+        CorpusEntry(
+            "multi_packet_known_answers",
+            "A browser query with enough known answers to be split over several packets with the TC bit set.",
+            _multi_packet_known_answers().packets(),
+        ),
+        CorpusEntry(
+            "compression_heavy",
+            "A bridge answering for many accessories of the same type behind the same host.",
+            _compression_heavy().packets(),
+        ),
+        CorpusEntry(
+            "simple_query",
+            "A QM query for a single service type and the A/AAAA records of a host.",
+            _simple_query().packets(),
+        ),
+    ]
+
+
+def main() -> None:
+    """Regenerate the checked in packet corpus."""
+    entries = [
+        {
+            'name': entry.name,
+            'description': entry.description,
+            'packets': [packet.hex() for packet in entry.packets],
+        }
+        for entry in generate_corpus()
+    ]
+    with open(CORPUS_PATH, 'w') as corpus_file:
+        json.dump(entries, corpus_file, indent=2)
+        corpus_file.write('\n')
+
+
+if __name__ == '__main__':
+    main()
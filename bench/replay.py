@@ -0,0 +1,321 @@
+""" Multicast DNS Service Discovery for Python, v0.14-wmcbrine
+    Copyright 2003 Paul Scott-Murphy, 2014 William McBrine
+
+    This module provides a framework for the use of DNS Service Discovery
+    using IP multicast.
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation; either
+    version 2.1 of the License, or (at your option) any later version.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301
+    USA
+"""
+
+import argparse
+import asyncio
+import json
+import selectors
+import socket
+import struct
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple, cast
+from unittest.mock import patch
+
+from zeroconf import ServiceStateChange, _core
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncZeroconf
+from zeroconf.const import _MDNS_PORT
+
+_PCAP_MAGIC_USEC = 0xA1B2C3D4
+_PCAP_MAGIC_NSEC = 0xA1B23C4D
+_LINKTYPE_ETHERNET = 1
+_LINKTYPE_RAW = 101
+_LINKTYPE_LINUX_SLL = 113
+_ETHERTYPE_IPV4 = 0x0800
+_ETHERTYPE_IPV6 = 0x86DD
+_ETHERTYPE_VLAN = 0x8100
+_IPPROTO_UDP = 17
+
+
+class CapturedPacket(NamedTuple):
+    """A datagram from a capture."""
+
+    timestamp: float  # seconds since the epoch
+    source: str
+    port: int
+    data: bytes
+
+
+def read_json_lines(path: str) -> Iterator[CapturedPacket]:
+    """Read a capture of one JSON object per line.
+
+    Each line has a timestamp in seconds, a source address,
+    an optional source port and the packet as hex in data.
+    """
+    with open(path) as capture:
+        for line in capture:
+            if not line.strip():
+                continue
+            packet = json.loads(line)
+            yield CapturedPacket(
+                float(packet['timestamp']),
+                packet['source'],
+                int(packet.get('port', _MDNS_PORT)),
+                bytes.fromhex(packet['data']),
+            )
+
+
+def _ip_payload(frame: bytes) -> Optional[Tuple[str, int, bytes]]:
+    """Return the source address, source port and payload of an mDNS UDP datagram."""
+    version = frame[0] >> 4 if frame else 0
+    if version == 4:
+        header_length = (frame[0] & 0x0F) * 4
+        if frame[9] != _IPPROTO_UDP:
+            return None
+        source = socket.inet_ntop(socket.AF_INET, frame[12:16])
+        udp = frame[header_length:]
+    elif version == 6:
+        # Extension headers are not followed
+        if frame[6] != _IPPROTO_UDP:
+            return None
+        source = socket.inet_ntop(socket.AF_INET6, frame[8:24])
+        udp = frame[40:]
+    else:
+        return None
+    if len(udp) < 8:
+        return None
+    source_port, dest_port, length = struct.unpack('!HHH', udp[:6])
+    if _MDNS_PORT not in (source_port, dest_port):
+        return None
+    return source, source_port, udp[8:length]
+
+
+def _link_payload(link_type: int, frame: bytes) -> Optional[bytes]:
+    """Strip the link layer header from a frame."""
+    if link_type == _LINKTYPE_RAW:
+        return frame
+    if link_type == _LINKTYPE_ETHERNET:
+        offset = 12
+    elif link_type == _LINKTYPE_LINUX_SLL:
+        offset = 14
+    else:
+        raise ValueError(f"Unsupported pcap link type {link_type}")
+    ether_type = struct.unpack('!H', frame[offset : offset + 2])[0]
+    if ether_type == _ETHERTYPE_VLAN:
+        offset += 4
+        ether_type = struct.unpack('!H', frame[offset : offset + 2])[0]
+    if ether_type not in (_ETHERTYPE_IPV4, _ETHERTYPE_IPV6):
+        return None
+    return frame[offset + 2 :]
+
+
+def read_pcap(path: str) -> Iterator[CapturedPacket]:
+    """Read the mDNS datagrams from a classic pcap file.
+
+    Ethernet, Linux cooked and raw IP captures are supported, pcapng is not.
+    """
+    with open(path, 'rb') as capture:
+        header = capture.read(24)
+        for endian in ('<', '>'):
+            magic = struct.unpack(endian + 'I', header[:4])[0]
+            if magic in (_PCAP_MAGIC_USEC, _PCAP_MAGIC_NSEC):
+                break
+        else:
+            raise ValueError(f"{path} is not a pcap file")
+        divisor = 1e9 if magic == _PCAP_MAGIC_NSEC else 1e6
+        link_type = struct.unpack(endian + 'I', header[20:24])[0]
+        record_header = struct.Struct(endian + 'IIII')
+        while True:
+            header = capture.read(record_header.size)
+            if len(header) < record_header.size:
+                return
+            seconds, fraction, captured_length, _ = record_header.unpack(header)
+            payload = _link_payload(link_type, capture.read(captured_length))
+            datagram = _ip_payload(payload) if payload else None
+            if datagram:
+                yield CapturedPacket(seconds + fraction / divisor, *datagram)
+
+
+def read_capture(path: str) -> List[CapturedPacket]:
+    """Read a pcap or JSON lines capture sorted by time."""
+    with open(path, 'rb') as capture:
+        is_json = capture.read(1) in (b'{', b'\n', b' ')
+    packets = read_json_lines(path) if is_json else read_pcap(path)
+    return sorted(packets, key=lambda packet: packet.timestamp)
+
+
+class _VirtualClockSelector(selectors.DefaultSelector):  # type: ignore
+    """A selector that advances the clock instead of waiting."""
+
+    def __init__(self, loop: 'VirtualClockEventLoop') -> None:
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[selectors.SelectorKey, int]]:
+        events = super().select(0)
+        if not events and timeout:
+            self._loop.advance(timeout)
+        return events  # type: ignore
+
+
+class VirtualClockEventLoop(asyncio.SelectorEventLoop):
+    """An event loop where time only moves when there is nothing left to do.
+
+    Timers fire as soon as everything before them has run so a
+    capture is replayed as fast as the CPU allows. The loop time
+    starts at zero to keep full float precision, epoch is the wall
+    clock time it corresponds to.
+    """
+
+    def __init__(self, epoch: float) -> None:
+        self.epoch = epoch
+        self._virtual_time = 0.0
+        super().__init__(_VirtualClockSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def current_time_millis(self) -> float:
+        """The virtual wall clock time in milliseconds."""
+        return (self.epoch + self._virtual_time) * 1000
+
+    def advance(self, seconds: float) -> None:
+        self._virtual_time += seconds
+
+
+class _ReplaySocket:
+    """Enough of a socket to send from."""
+
+    family = socket.AF_INET
+
+    def fileno(self) -> int:
+        return -1
+
+
+class _ReplayTransport(asyncio.DatagramTransport):
+    """A transport that counts what would have been sent."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self._socket = _ReplaySocket()
+
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        if name == 'socket':
+            return self._socket
+        return default
+
+    def sendto(self, data: Any, addr: Any = None) -> None:
+        self.packets_sent += 1
+        self.bytes_sent += len(data)
+
+    def close(self) -> None:
+        """Nothing to close."""
+
+
+class ReplayStats(NamedTuple):
+    """The outcome of a replay."""
+
+    packets: int
+    virtual_seconds: float
+    wall_seconds: float
+    packets_sent: int
+    bytes_sent: int
+    cache_records: int
+    peak_memory: Optional[int]
+
+
+def _noop_handler(zeroconf: Any, service_type: str, name: str, state_change: ServiceStateChange) -> None:
+    """Browsers need a handler to run."""
+
+
+async def async_replay(packets: List[CapturedPacket], browse: List[str], tail: float) -> ReplayStats:
+    """Feed the packets into a Zeroconf instance at their capture times on the running loop."""
+    loop = cast(VirtualClockEventLoop, asyncio.get_running_loop())
+    transport = _ReplayTransport()
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    await zc.async_wait_for_start()
+    zc.engine.senders.append(transport)
+    listener = _core.AsyncListener(zc)
+    listener.transport = transport
+    browser = AsyncServiceBrowser(zc, browse, handlers=[_noop_handler]) if browse else None
+
+    virtual_start = loop.time()
+    wall_start = time.perf_counter()
+    for packet in packets:
+        delay = packet.timestamp - loop.epoch - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        listener.datagram_received(packet.data, (packet.source, packet.port))
+    await asyncio.sleep(tail)
+    wall_seconds = time.perf_counter() - wall_start
+    virtual_seconds = loop.time() - virtual_start
+
+    cache_records = sum(len(records) for records in zc.cache.cache.values())
+    peak_memory = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    if browser:
+        await browser.async_cancel()
+    await aiozc.async_close()
+    return ReplayStats(
+        len(packets),
+        virtual_seconds,
+        wall_seconds,
+        transport.packets_sent,
+        transport.bytes_sent,
+        cache_records,
+        peak_memory,
+    )
+
+
+def replay(packets: List[CapturedPacket], browse: List[str], tail: float = 0) -> ReplayStats:
+    """Replay a capture on a virtual clock that starts at the first packet."""
+    loop = VirtualClockEventLoop(packets[0].timestamp if packets else time.time())
+    with ExitStack() as stack:
+        # Nothing is read from or sent to the network
+        stack.enter_context(patch.object(_core, "create_sockets", return_value=(None, [])))
+        for module in [module for name, module in sys.modules.items() if name.startswith('zeroconf')]:
+            if hasattr(module, 'current_time_millis'):
+                stack.enter_context(patch.object(module, 'current_time_millis', loop.current_time_millis))
+        try:
+            return loop.run_until_complete(async_replay(packets, browse, tail))
+        finally:
+            loop.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay an mDNS capture on a virtual clock.")
+    parser.add_argument('capture', help="A pcap file or a JSON lines file of timestamp/source/port/data")
+    parser.add_argument('--browse', action='append', default=[], help="Run a browser for this type")
+    parser.add_argument('--tail', type=float, default=0, help="Seconds to keep running after the last packet")
+    parser.add_argument('--memory', action='store_true', help="Trace peak memory use (slower)")
+    parser.add_argument('--json', help="Write the stats as JSON to this file")
+    args = parser.parse_args()
+
+    packets = read_capture(args.capture)
+    if args.memory:
+        tracemalloc.start()
+    stats = replay(packets, args.browse, args.tail)
+    for field, value in stats._asdict().items():
+        print(f"{field:<16} {value}")
+    if stats.wall_seconds:
+        print(f"{'packets/s':<16} {stats.packets / stats.wall_seconds:.0f}")
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(stats._asdict(), json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
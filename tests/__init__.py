@@ -77,4 +77,9 @@ def has_working_ipv6():
 
 def _clear_cache(zc):
     zc.cache.cache.clear()
+    zc.cache._details_cache.clear()
+    zc.cache._expirations.clear()
+    zc.cache._expire_heap.clear()
+    zc.cache._evict_last_heap.clear()
     zc.question_history._history.clear()
+    zc.multicast_history._interfaces.clear()
@@ -22,7 +22,7 @@ from zeroconf import Zeroconf
 from zeroconf._services import ServiceStateChange
 from zeroconf._services.browser import ServiceBrowser
 from zeroconf._services.info import ServiceInfo
-from zeroconf.asyncio import AsyncZeroconf
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncZeroconf
 
 from .. import has_working_ipv6, _inject_response, _wait_for_start
 
@@ -1018,3 +1018,58 @@ async def test_query_scheduler():
     assert set(query_scheduler.process_ready_types(now + delay * 20)) == set()
 
     assert set(query_scheduler.process_ready_types(now + delay * 31)) == set(["_http._tcp.local."])
+
+
+def test_query_scheduler_reschedules_with_a_bounded_heap():
+    """Test rescheduling types many times keeps the scheduler correct and its heap small."""
+    delay = const._BROWSER_TIME
+    types_ = {f"_type{i}._tcp.local." for i in range(100)}
+    query_scheduler = _services_browser.QueryScheduler(types_, delay, (0, 0))
+    now = current_time_millis()
+    query_scheduler.start(now)
+
+    assert set(query_scheduler.process_ready_types(now)) == types_
+    for i in range(1000):
+        query_scheduler.reschedule_type(f"_type{i % 100}._tcp.local.", now + delay - i - 1)
+    assert len(query_scheduler._next_time_heap) <= 4 * len(types_) + 1
+
+    assert query_scheduler.millis_to_wait(now) == delay - 1000
+    assert query_scheduler.process_ready_types(now + delay - 1000) == ["_type99._tcp.local."]
+    assert set(query_scheduler.process_ready_types(now + delay - 901)) == types_ - {"_type99._tcp.local."}
+    assert query_scheduler.process_ready_types(now + delay - 901) == []
+    assert query_scheduler.queries_sent["_type99._tcp.local."] == 2
+    assert query_scheduler.queries_sent["_type0._tcp.local."] == 2
+
+
+@pytest.mark.asyncio
+async def test_browsers_share_query_packets():
+    """Test the queries of all the browsers of an instance are sent together."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    await zc.async_wait_for_start()
+    types_ = {f"_share{i}._tcp.local." for i in range(10)}
+    sent = []
+
+    def send(out, addr=const._MDNS_ADDR, port=const._MDNS_PORT, v6_flow_scope=()):
+        sent.append(out)
+
+    def on_service_state_change(zeroconf, service_type, state_change, name):
+        pass
+
+    with patch.object(zc, "async_send", send):
+        browsers = [AsyncServiceBrowser(zc, type_, [on_service_state_change]) for type_ in types_]
+        await asyncio.sleep(millis_to_seconds(_services_browser._FIRST_QUERY_DELAY_RANDOM_INTERVAL[1] + 50))
+        assert len(sent) == 1
+        assert {question.name for question in sent[0].questions} == types_
+        assert all(question.unicast for question in sent[0].questions)
+
+        await asyncio.sleep(millis_to_seconds(_services_browser._BROWSER_TIME + 50))
+        assert len(sent) == 2
+        assert {question.name for question in sent[1].questions} == types_
+        assert not any(question.unicast for question in sent[1].questions)
+
+        for browser in browsers:
+            await browser.async_cancel()
+
+    assert not zc.browser_query_scheduler._browsers
+    await aiozc.async_close()
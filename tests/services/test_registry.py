@@ -130,3 +130,72 @@ class TestServiceRegistry(unittest.TestCase):
         assert registry.async_get_infos_type(type_.upper()) == [info]
         assert registry.async_get_infos_server("ASH-2.local.") == [info]
         assert registry.async_get_types() == [type_]
+
+    def test_records_are_rebuilt_on_update(self):
+        type_ = "_test-srvc-type._tcp.local."
+        name = "xxxyyy"
+        registration_name = "%s.%s" % (name, type_)
+
+        desc = {'path': '/~paulsm/'}
+        info = ServiceInfo(
+            type_, registration_name, 80, 0, 0, desc, "ash-2.local.", addresses=[socket.inet_aton("10.0.1.2")]
+        )
+
+        registry = r.ServiceRegistry()
+        registry.async_add(info)
+
+        records = registry.async_get_records_name(registration_name)
+        assert records is not None
+        assert list(registry.async_get_records_type(type_)) == [records]
+        assert list(registry.async_get_records_server("ASH-2.local.")) == [records]
+        assert records.pointer == info.dns_pointer()
+        assert records.pointer_additionals == {
+            info.dns_service(),
+            info.dns_text(),
+            *info.dns_addresses(),
+            records.nsec,
+        }
+        assert records.nsec is not None
+        assert records.nsec.rdtypes == [r.const._TYPE_AAAA]
+        assert records.service_additionals == {*info.dns_addresses(), records.nsec}
+
+        info.port = 81
+        registry.async_update(info)
+        updated = registry.async_get_records_name(registration_name)
+        assert updated is not records
+        assert updated.service == info.dns_service()
+        assert updated.service.port == 81
+
+        registry.async_remove(info)
+        assert registry.async_get_records_name(registration_name) is None
+        assert list(registry.async_get_records_type(type_)) == []
+
+    def test_has_name_and_empty_indexes_are_removed(self):
+        type_ = "_test-srvc-type._tcp.local."
+        name = "xxxyyy"
+        registration_name = "%s.%s" % (name, type_)
+
+        desc = {'path': '/~paulsm/'}
+        info = ServiceInfo(
+            type_, registration_name, 80, 0, 0, desc, "ash-2.local.", addresses=[socket.inet_aton("10.0.1.2")]
+        )
+
+        registry = r.ServiceRegistry()
+        assert not registry.async_has_name(type_)
+        registry.async_add(info)
+        assert registry.async_has_name(type_.upper())
+        assert registry.async_has_name(registration_name)
+        assert registry.async_has_name("ash-2.local.")
+        assert not registry.async_has_name("other.local.")
+
+        # The server can change before the update
+        info.server = "ash-3.local."
+        registry.async_update(info)
+        assert not registry.async_has_name("ash-2.local.")
+        assert registry.async_get_infos_server("ash-3.local.") == [info]
+
+        registry.async_remove(info)
+        assert registry.async_get_types() == []
+        assert not registry.async_has_name(type_)
+        assert not registry.async_has_name(registration_name)
+        assert not registry.async_has_name("ash-3.local.")
@@ -355,6 +355,128 @@ async def test_async_service_registration_name_conflict() -> None:
     await aiozc.async_close()
 
 
+@pytest.mark.asyncio
+async def test_async_register_services() -> None:
+    """Test registering many services probes and announces them together."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    type_ = "_test-bulk-type._tcp.local."
+    type_2 = "_test-bulk2-type._tcp.local."
+    infos = [
+        ServiceInfo(
+            type_ if i % 2 else type_2,
+            f"bulk{i}.{type_ if i % 2 else type_2}",
+            80,
+            0,
+            0,
+            {},
+            f"ash-{i}.local.",
+            addresses=[socket.inet_aton("10.0.1.2")],
+        )
+        for i in range(50)
+    ]
+    # The same name twice in one batch
+    infos.append(
+        ServiceInfo(
+            type_, f"bulk1.{type_}", 80, 0, 0, {}, "ash-1.local.", addresses=[socket.inet_aton("10.0.1.2")]
+        )
+    )
+
+    with patch.object(zc, "async_send", wraps=zc.async_send) as async_send:
+        with pytest.raises(NonUniqueNameException):
+            await aiozc.async_register_services(infos)
+        assert not zc.registry.async_get_service_infos()
+
+        async_send.reset_mock()
+        task = await aiozc.async_register_services(infos, allow_name_change=True)
+        probes = [args[0][0] for args in async_send.call_args_list if args[0][0].is_query()]
+        await task
+
+    assert infos[-1].name == f"bulk1-2.{type_}"
+    assert len(zc.registry.async_get_service_infos()) == 51
+    assert len(probes) == 3
+    assert {question.name for question in probes[0].questions} == {type_, type_2}
+    assert len(probes[0].authorities) == 51
+    # Three announcements of every service, packed into a few packets each time
+    announcements = [args[0][0] for args in async_send.call_args_list if not args[0][0].is_query()]
+    assert 3 <= len(announcements) < 51
+
+    with pytest.raises(NonUniqueNameException):
+        await aiozc.async_register_services(infos[:1])
+    await aiozc.async_close()
+
+
+@pytest.mark.asyncio
+async def test_async_register_services_is_all_or_nothing() -> None:
+    """Test a batch with a registered name adds none of its services and an empty batch sends nothing."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    type_ = "_test-bulk-type._tcp.local."
+    info_a, info_b = (
+        ServiceInfo(
+            type_, f"{name}.{type_}", 80, 0, 0, {}, "ash-2.local.", addresses=[socket.inet_aton("10.0.1.2")]
+        )
+        for name in ("a", "b")
+    )
+    task = await aiozc.async_register_services([info_a], cooperating_responders=True)
+    await task
+
+    with pytest.raises(ServiceNameAlreadyRegistered):
+        await aiozc.async_register_services([info_b, info_a], cooperating_responders=True)
+    assert zc.registry.async_get_service_infos() == [info_a]
+
+    with patch.object(zc, "async_send") as async_send:
+        await (await aiozc.async_register_services([]))
+        await (await aiozc.async_unregister_services([]))
+    assert async_send.call_count == 0
+    await aiozc.async_close()
+
+
+@pytest.mark.asyncio
+async def test_async_unregister_services() -> None:
+    """Test unregistering many services sends packed goodbyes."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    type_ = "_test-bye-type._tcp.local."
+    type_2 = "_test-bye2-type._tcp.local."
+    infos = [
+        ServiceInfo(
+            type_ if i % 2 else type_2,
+            f"bye{i}.{type_ if i % 2 else type_2}",
+            80,
+            0,
+            0,
+            {},
+            "ash-2.local.",
+            addresses=[socket.inet_aton("10.0.1.2")],
+        )
+        for i in range(20)
+    ]
+    task = await aiozc.async_register_services(infos, cooperating_responders=True)
+    await task
+
+    sent = []
+    with patch.object(zc, "async_send_multicast_answers", sent.append):
+        task = await aiozc.async_unregister_services(zc.registry.async_get_infos_type(type_))
+        await task
+
+    assert len(zc.registry.async_get_service_infos()) == 10
+    assert not zc.registry.async_get_infos_type(type_)
+    assert len(sent) == 3
+    # Every goodbye is sent at once, but not the addresses still used by the other type
+    assert all(record.ttl == 0 for record in sent[0])
+    assert len(sent[0]) == 30
+    assert not any(record.type == const._TYPE_A for record in sent[0])
+
+    with patch.object(zc, "async_send_multicast_answers", sent.append):
+        task = await aiozc.async_unregister_services(zc.registry.async_get_infos_server("ash-2.local."))
+        await task
+
+    assert not zc.registry.async_get_service_infos()
+    assert sum(record.type == const._TYPE_A for record in sent[3]) == 1
+    await aiozc.async_close()
+
+
 @pytest.mark.asyncio
 async def test_async_service_registration_name_does_not_match_type() -> None:
     """Test registering services throws when the name does not match the type."""
@@ -123,6 +123,137 @@ class TestDNSAsyncCacheAPI(unittest.TestCase):
         assert set(cache.async_entries_with_name('irrelevant')) == {record1, record2}
         assert set(cache.async_entries_with_name('Irrelevant')) == {record1, record2}
 
+    def test_details_index(self):
+        record1 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'a')
+        record2 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'b')
+        record3 = r.DNSAddress('a', const._TYPE_AAAA, const._CLASS_IN, 1, b'c' * 16)
+        record4 = r.DNSAddress('A', const._TYPE_A, const._CLASS_IN | const._CLASS_UNIQUE, 10, b'a')
+        cache = r.DNSCache()
+        cache.async_add_records([record1, record2, record3])
+        assert list(cache.async_all_by_details('A', const._TYPE_A, const._CLASS_IN)) == [record1, record2]
+        assert cache.get_by_details('a', const._TYPE_AAAA, const._CLASS_IN) is record3
+        assert cache.get_by_details('a', const._TYPE_A, const._CLASS_CH) is None
+
+        # A record that is __eq__ to a cached one replaces it and becomes the last added
+        cache.async_add_records([record4])
+        assert cache.get_by_details('a', const._TYPE_A, const._CLASS_IN) is record4
+        assert [record.ttl for record in cache.get_all_by_details('a', const._TYPE_A, const._CLASS_IN)] == [
+            1,
+            10,
+        ]
+
+        cache.async_remove_records([record1, record2, record3])
+        assert cache.get_all_by_details('a', const._TYPE_A, const._CLASS_IN) == []
+        assert not cache._details_cache
+
+    def test_async_evict(self):
+        now = r.current_time_millis()
+        records = [
+            r.DNSAddress(name, const._TYPE_A, const._CLASS_IN, ttl, b'a', created=now)
+            for ttl, name in enumerate(('a', 'b', 'c', 'd', 'e'), 1)
+        ]
+        cache = r.DNSCache(max_records=3)
+        cache.async_add_records(records)
+        assert cache.async_evict(lambda record: False) == [records[0], records[1]]
+
+        # Records someone is interested in are passed over
+        cache.async_add_records(records[:2])
+        assert cache.async_evict(lambda record: record.name in ('a', 'c')) == [records[1], records[3]]
+        assert set(cache.names()) == {'a', 'c', 'e'}
+
+        # But evicted if nothing else is left
+        cache.max_records = 2
+        assert cache.async_evict(lambda record: True) == [records[0]]
+        assert cache.evictions == 5
+        assert cache.async_evict(lambda record: True) == []
+        assert r.DNSCache().async_evict(lambda record: False) == []
+
+    def test_async_evict_passes_over_many_interesting_records(self):
+        now = r.current_time_millis()
+        interesting = [
+            r.DNSAddress(f"host{i}.local.", const._TYPE_A, const._CLASS_IN, 120, b'a', created=now)
+            for i in range(50)
+        ]
+        flood = [
+            r.DNSPointer(
+                "_flood._tcp.local.", const._TYPE_PTR, const._CLASS_IN, 4500, f"{i}._flood._tcp.local.", now
+            )
+            for i in range(50)
+        ]
+        cache = r.DNSCache(max_records=60)
+        cache.async_add_records(interesting + flood)
+        evicted = cache.async_evict(lambda record: record.type == const._TYPE_A)
+        assert len(evicted) == 40
+        assert set(evicted) <= set(flood)
+        assert all(cache.async_get_unique(record) is not None for record in interesting)
+        # Evicted records are expired so listeners see them as gone
+        assert all(record.is_expired(now) for record in evicted)
+
+        # Records that were passed over still expire on time
+        assert set(cache.async_expire(now + 121 * 1000)) == set(interesting)
+        assert len(cache.async_entries_with_name("_flood._tcp.local.")) == 10
+
+    def test_async_expire(self):
+        now = r.current_time_millis()
+        record1 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'a', created=now)
+        record2 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 10, b'b', created=now)
+        record3 = r.DNSAddress('b', const._TYPE_A, const._CLASS_IN, 100, b'c', created=now)
+        cache = r.DNSCache()
+        cache.async_add_records([record1, record2, record3])
+        assert cache.async_expire(now + 999) == []
+        assert cache.async_expire(now + 1000) == [record1]
+        assert cache.async_expire(now + 1000) == []
+
+        # Moving the expiration sooner expires the record sooner
+        cache.async_set_created_ttl(record3, now, 5)
+        # Extending the ttl without telling the cache delays the expiration
+        record2.set_created_ttl(now, 20)
+        assert cache.async_expire(now + 10000) == [record3]
+        assert cache.async_expire(now + 20000) == [record2]
+        assert not cache.cache
+
+    def test_async_expire_replaced_and_removed_records(self):
+        now = r.current_time_millis()
+        record1 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'a', created=now)
+        record2 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 10, b'a', created=now)
+        record3 = r.DNSAddress('b', const._TYPE_A, const._CLASS_IN, 1, b'b', created=now)
+        cache = r.DNSCache()
+        cache.async_add_records([record1, record3])
+        # record2 is __eq__ to record1 and replaces it
+        cache.async_add_records([record2])
+        cache.async_remove_records([record3])
+        assert cache.async_expire(now + 1000) == []
+        assert cache.async_expire(now + 10000) == [record2]
+
+    def test_async_expire_heap_stays_bounded(self):
+        now = r.current_time_millis()
+        records = [
+            r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 100, bytes([i]), created=now) for i in range(10)
+        ]
+        cache = r.DNSCache()
+        cache.async_add_records(records)
+        for i in range(1000):
+            cache.async_reset_ttl(records[i % 10], records[i % 10])
+        assert len(cache._expire_heap) <= max(64, 2 * len(records)) + 1
+        assert set(cache.async_expire(now + 100000)) == set(records)
+
+    def test_async_expire_replaced_record_after_rebuild(self):
+        now = r.current_time_millis()
+        record = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 10, b'a', created=now)
+        duplicate = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 10, b'a', created=now)
+        others = [
+            r.DNSAddress('b', const._TYPE_A, const._CLASS_IN, 3600, bytes([i]), created=now)
+            for i in range(10)
+        ]
+        cache = r.DNSCache()
+        cache.async_add_records([record, duplicate, *others])
+        assert cache.async_get_unique(record) is duplicate
+        # Rescheduling the other records forces the heap to be rebuilt
+        for i in range(200):
+            cache.async_reset_ttl(others[i % 10], others[i % 10])
+        assert cache.async_expire(now + 11 * 1000) == [duplicate]
+        assert cache.async_get_unique(record) is None
+
 
 # These functions have been seen in other projects so
 # we try to maintain a stable API for all the threadsafe getters
@@ -188,6 +319,28 @@ class TestDNSCacheAPI(unittest.TestCase):
         cache.async_add_records([record1, record2])
         assert cache.current_entry_with_name_and_alias('irrelevant', 'x.irrelevant') == record1
 
+    def test_reads_are_not_changed_by_writes(self):
+        record1 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'a')
+        record2 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'b')
+        record3 = r.DNSAddress('a', const._TYPE_A, const._CLASS_IN, 1, b'c')
+        cache = r.DNSCache()
+        cache.async_add_records([record1, record2])
+        entries = cache.async_entries_with_name('a')
+        details = cache.async_all_by_details('a', const._TYPE_A, const._CLASS_IN)
+        assert next(details) == record1
+
+        cache.async_add_records([record3])
+        cache.async_remove_records([record1])
+        # Buckets already read are left as they were
+        assert list(entries) == [record1, record2]
+        assert list(details) == [record2]
+        assert cache.get_all_by_details('a', const._TYPE_A, const._CLASS_IN) == [record2, record3]
+        assert cache.get_by_details('a', const._TYPE_A, const._CLASS_IN) == record3
+
+        cache.async_remove_records([record2, record3])
+        assert cache.cache == {}
+        assert cache._details_cache == {}
+
     def test_name(self):
         record1 = r.DNSService(
             'irrelevant', const._TYPE_SRV, const._CLASS_IN, const._DNS_HOST_TTL, 0, 0, 85, 'ab'
@@ -730,7 +730,134 @@ def test_guard_against_duplicate_packets():
     assert listener.suppress_duplicate_packet(b"other packet", current_time_millis()) is False
     assert listener.suppress_duplicate_packet(b"other packet", current_time_millis()) is True
     assert listener.suppress_duplicate_packet(b"other packet", current_time_millis() + 1000) is False
-    assert listener.suppress_duplicate_packet(b"first packet", current_time_millis()) is False
+    # The window covers more than the last packet
+    assert listener.suppress_duplicate_packet(b"first packet", current_time_millis()) is True
+    # and is shared between all listeners of the instance
+    other_listener = _core.AsyncListener(zc)
+    assert other_listener.suppress_duplicate_packet(b"other packet", current_time_millis()) is True
+    assert other_listener.suppress_duplicate_packet(b"third packet", current_time_millis()) is False
+    assert listener.suppress_duplicate_packet(b"third packet", current_time_millis()) is True
+    # A packet received on another IPv6 interface is not a duplicate
+    addrs = ("fe80::1", 5353, 0, 2)
+    assert listener.suppress_duplicate_packet(b"third packet", current_time_millis(), addrs) is False
+    assert listener.suppress_duplicate_packet(b"third packet", current_time_millis(), addrs) is True
+    # Neither is the same packet from another host
+    addrs = ("10.0.0.2", 5353)
+    assert listener.suppress_duplicate_packet(b"third packet", current_time_millis(), addrs) is False
+    assert zc.packet_history.hits >= 6
+    zc.close()
+
+
+def test_burst_of_responses_is_processed_as_one_update():
+    """Ensure datagrams waiting on the socket are drained and processed as a single update."""
+    zc = Zeroconf(interfaces=['127.0.0.1'])
+    records = [
+        r.DNSText(
+            f"burst{i}.local.",
+            const._TYPE_TXT,
+            const._CLASS_IN | const._CLASS_UNIQUE,
+            500,
+            b'path=/~paulsm/',
+        )
+        for i in range(3)
+    ]
+    packets = []
+    for record in records:
+        generated = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+        generated.add_answer_at_time(record, 0)
+        packets.append(generated.packets()[0])
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.setblocking(False)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for packet in packets[1:]:
+        sender.sendto(packet, sock.getsockname())
+    time.sleep(0.1)
+
+    listener = _core.AsyncListener(zc, sock)
+    listener.transport = unittest.mock.MagicMock()
+    with patch.object(zc.record_manager, "async_updates_complete") as updates_complete:
+        listener.datagram_received(packets[0], ('127.0.0.1', const._MDNS_PORT))
+
+    assert updates_complete.call_count == 1
+    for record in records:
+        assert zc.cache.async_get_unique(record) is not None
+    sender.close()
+    sock.close()
+    zc.close()
+
+
+def test_queries_with_corrupt_known_answers_are_dropped():
+    """Ensure a query is not answered when its known answers cannot be decoded."""
+    zc = Zeroconf(interfaces=['127.0.0.1'])
+    generated = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+    generated.add_question(r.DNSQuestion("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN))
+    generated.add_answer_at_time(
+        r.DNSPointer("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN, 4500, "known._hap._tcp.local."),
+        0,
+    )
+    packet = generated.packets()[0]
+
+    listener = _core.AsyncListener(zc)
+    listener.transport = unittest.mock.MagicMock()
+    zc.record_manager.async_add_interest(["_hap._tcp.local."])
+    with patch.object(zc, "handle_assembled_query") as handle_assembled_query:
+        # Cut the packet off in the middle of the known answer's type and class
+        listener.datagram_received(packet[:-12], ('127.0.0.1', const._MDNS_PORT))
+        assert handle_assembled_query.call_count == 0
+        listener.datagram_received(packet, ('127.0.0.1', const._MDNS_PORT))
+        assert handle_assembled_query.call_count == 1
+    zc.close()
+
+
+def test_queries_we_cannot_answer_are_dropped_without_decoding_known_answers():
+    """Ensure the known answers of a query are only decoded if we can answer it."""
+    zc = Zeroconf(interfaces=['127.0.0.1'])
+    type_ = "_hap._tcp.local."
+    generated = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+    generated.add_question(r.DNSQuestion(type_, const._TYPE_PTR, const._CLASS_IN))
+    generated.add_answer_at_time(
+        r.DNSPointer(type_, const._TYPE_PTR, const._CLASS_IN, 4500, f"known.{type_}"),
+        0,
+    )
+    packet = generated.packets()[0]
+    info = r.ServiceInfo(
+        type_,
+        f"registered.{type_}",
+        80,
+        0,
+        0,
+        {'path': '/~paulsm/'},
+        "ash-2.local.",
+        addresses=[socket.inet_aton("10.0.1.2")],
+    )
+
+    listener = _core.AsyncListener(zc)
+    listener.transport = unittest.mock.MagicMock()
+    decoded = []
+    read_others = r.DNSIncoming.read_others
+
+    def _read_others(incoming):
+        decoded.append(incoming)
+        read_others(incoming)
+
+    # The debug log of a received packet includes its decoded records
+    log.setLevel(logging.INFO)
+    try:
+        with patch.object(zc, "handle_assembled_query") as handle_assembled_query, patch.object(
+            r.DNSIncoming, "read_others", _read_others
+        ):
+            listener.datagram_received(packet, ('127.0.0.1', const._MDNS_PORT))
+            assert handle_assembled_query.call_count == 0
+            assert decoded == []
+
+            zc.registry.async_add(info)
+            listener.datagram_received(packet, ('127.0.0.2', const._MDNS_PORT))
+            assert handle_assembled_query.call_count == 1
+            assert len(decoded) == 1
+    finally:
+        log.setLevel(logging.DEBUG)
     zc.close()
 
 
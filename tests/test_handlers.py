@@ -16,7 +16,12 @@ from typing import List
 import zeroconf as r
 from zeroconf import _handlers, ServiceInfo, Zeroconf, current_time_millis
 from zeroconf import const
-from zeroconf._handlers import construct_outgoing_multicast_answers, MulticastOutgoingQueue
+from zeroconf._handlers import (
+    construct_outgoing_multicast_answers,
+    construct_outgoing_multicast_answers_packed,
+    MulticastOutgoingQueue,
+)
+from zeroconf._history import QuestionHistory
 from zeroconf._utils.time import millis_to_seconds
 from zeroconf.asyncio import AsyncZeroconf
 
@@ -986,6 +991,99 @@ async def test_qu_response_only_sends_additionals_if_sends_answer():
     await aiozc.async_close()
 
 
+@pytest.mark.asyncio
+async def test_multicast_history_suppresses_without_hearing_our_own_packets():
+    """Test records we multicast are not multicast again within a second even if we never see them."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    await zc.async_wait_for_start()
+
+    type_ = "_histtest._tcp.local."
+    registration_name = f"knownname.{type_}"
+    info = ServiceInfo(
+        type_,
+        registration_name,
+        80,
+        0,
+        0,
+        {'path': '/~paulsm/'},
+        "ash-2.local.",
+        addresses=[socket.inet_aton("10.0.1.2")],
+    )
+    zc.registry.async_add(info)
+
+    query = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+    query.add_question(r.DNSQuestion(type_, const._TYPE_PTR, const._CLASS_IN))
+    question_answers = zc.query_handler.async_response([r.DNSIncoming(query.packets()[0])], False)
+    assert info.dns_pointer() in question_answers.mcast_aggregate
+
+    # Nothing goes out on the wire so the cache never sees the response
+    with unittest.mock.patch.object(zc, "_async_send_transport", return_value=True):
+        zc.async_send_multicast_answers(question_answers.mcast_aggregate)
+    assert zc.cache.async_get_unique(info.dns_pointer()) is None
+
+    question_answers = zc.query_handler.async_response([r.DNSIncoming(query.packets()[0])], False)
+    assert not question_answers.mcast_aggregate
+    assert info.dns_pointer() in question_answers.mcast_aggregate_last_second
+
+    zc.registry.async_remove(info)
+    await aiozc.async_close()
+
+
+@pytest.mark.asyncio
+async def test_multicast_history_only_records_sent_packets():
+    """Test records are not remembered as multicast when the packet could not be sent."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    await zc.async_wait_for_start()
+
+    type_ = "_histtest._tcp.local."
+    info = ServiceInfo(
+        type_,
+        f"knownname.{type_}",
+        80,
+        0,
+        0,
+        {'path': '/~paulsm/'},
+        "ash-2.local.",
+        addresses=[socket.inet_aton("10.0.1.2")],
+    )
+    zc.registry.async_add(info)
+
+    query = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+    query.add_question(r.DNSQuestion(type_, const._TYPE_PTR, const._CLASS_IN))
+    question_answers = zc.query_handler.async_response([r.DNSIncoming(query.packets()[0])], False)
+    with unittest.mock.patch("zeroconf._core.can_send_to", return_value=False):
+        zc.async_send_multicast_answers(question_answers.mcast_aggregate)
+
+    question_answers = zc.query_handler.async_response([r.DNSIncoming(query.packets()[0])], False)
+    assert info.dns_pointer() in question_answers.mcast_aggregate
+
+    zc.registry.async_remove(info)
+    await aiozc.async_close()
+
+
+def test_query_handler_without_multicast_history():
+    """Test the query handler can still be built without a multicast history."""
+    registry = r.ServiceRegistry()
+    handler = _handlers.QueryHandler(registry, r.DNSCache(), QuestionHistory())
+    info = ServiceInfo(
+        "_test._tcp.local.",
+        "name._test._tcp.local.",
+        80,
+        0,
+        0,
+        {},
+        "ash-2.local.",
+        addresses=[socket.inet_aton("10.0.1.2")],
+    )
+    registry.async_add(info)
+    query = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+    query.add_question(r.DNSQuestion("_test._tcp.local.", const._TYPE_PTR, const._CLASS_IN))
+    question_answers = handler.async_response([r.DNSIncoming(query.packets()[0])], False)
+    assert info.dns_pointer() in question_answers.mcast_aggregate
+
+
 # This test uses asyncio because it needs to access the cache directly
 # which is not threadsafe
 @pytest.mark.asyncio
@@ -1250,6 +1348,199 @@ async def test_duplicate_goodbye_answers_in_packet():
     await aiozc.async_close()
 
 
+@pytest.mark.asyncio
+async def test_updates_from_responses_last_record_wins():
+    """Ensure a burst of responses is merged with the last copy of a record winning."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    answer = r.DNSPointer(
+        "_burst._tcp.local.",
+        const._TYPE_PTR,
+        const._CLASS_IN,
+        const._DNS_OTHER_TTL,
+        'host._burst._tcp.local.',
+    )
+    other = r.DNSPointer(
+        "_burst._tcp.local.",
+        const._TYPE_PTR,
+        const._CLASS_IN,
+        const._DNS_OTHER_TTL,
+        'other._burst._tcp.local.',
+    )
+    good_bye_answer = r.DNSPointer(
+        "_burst._tcp.local.",
+        const._TYPE_PTR,
+        const._CLASS_IN,
+        0,
+        'host._burst._tcp.local.',
+    )
+    response = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+    response.add_answer_at_time(answer, 0)
+    zc.record_manager.async_updates_from_response(r.DNSIncoming(response.packets()[0]))
+
+    msgs = []
+    for record in (good_bye_answer, other, answer, good_bye_answer):
+        response = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+        response.add_answer_at_time(record, 0)
+        msgs.append(r.DNSIncoming(response.packets()[0]))
+
+    listener = unittest.mock.Mock()
+    zc.async_add_listener(listener, None)
+    zc.record_manager.async_updates_from_responses(msgs)
+    assert listener.async_update_records.call_count == 1
+    assert listener.async_update_records_complete.call_count == 1
+    assert zc.cache.async_get_unique(answer) is None
+    assert zc.cache.async_get_unique(other) is not None
+    await aiozc.async_close()
+
+
+@pytest.mark.asyncio
+async def test_interest_filter_only_caches_interesting_records():
+    """Ensure only records a listener is interested in are cached when the interest filter is enabled."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'], interest_filter=True)
+    zc = aiozc.zeroconf
+    wanted = ServiceInfo(
+        "_hap._tcp.local.",
+        "wanted._hap._tcp.local.",
+        80,
+        0,
+        0,
+        {},
+        "wanted-host.local.",
+        addresses=[socket.inet_aton("10.0.1.2")],
+    )
+    ignored = ServiceInfo(
+        "_airplay._tcp.local.",
+        "ignored._airplay._tcp.local.",
+        80,
+        0,
+        0,
+        {},
+        "ignored-host.local.",
+        addresses=[socket.inet_aton("10.0.1.3")],
+    )
+
+    def _inject_service_records() -> None:
+        response = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+        for info in (wanted, ignored):
+            response.add_answer_at_time(info.dns_pointer(), 0)
+            response.add_answer_at_time(info.dns_service(), 0)
+            response.add_answer_at_time(info.dns_text(), 0)
+            for record in info.dns_addresses():
+                response.add_answer_at_time(record, 0)
+        zc.record_manager.async_updates_from_response(r.DNSIncoming(response.packets()[0]))
+
+    listener = unittest.mock.Mock()
+    question = r.DNSQuestion("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN)
+    zc.async_add_listener(listener, question)
+    _inject_service_records()
+
+    assert zc.cache.async_get_unique(wanted.dns_pointer()) is not None
+    assert zc.cache.async_get_unique(wanted.dns_service()) is not None
+    assert zc.cache.async_get_unique(wanted.dns_text()) is not None
+    assert zc.cache.async_get_unique(wanted.dns_addresses()[0]) is not None
+    assert zc.cache.async_get_unique(ignored.dns_pointer()) is None
+    assert zc.cache.async_get_unique(ignored.dns_service()) is None
+    assert zc.cache.async_get_unique(ignored.dns_addresses()[0]) is None
+
+    # Records we already have in the cache keep being updated
+    # after the listener goes away
+    zc.async_remove_listener(listener)
+    _inject_service_records()
+    assert zc.cache.async_get_unique(wanted.dns_service()) is not None
+    assert zc.cache.async_get_unique(ignored.dns_service()) is None
+
+    # Registered services are always of interest
+    zc.registry.async_add(ignored)
+    _inject_service_records()
+    assert zc.cache.async_get_unique(ignored.dns_service()) is not None
+    zc.registry.async_remove(ignored)
+    await aiozc.async_close()
+
+
+@pytest.mark.asyncio
+async def test_bounded_cache_evicts_uninteresting_records_first():
+    """Ensure a bounded cache evicts records nobody is interested in before the ones a listener wants."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'], cache_max_records=20)
+    zc = aiozc.zeroconf
+    wanted = ServiceInfo(
+        "_hap._tcp.local.",
+        "wanted._hap._tcp.local.",
+        80,
+        0,
+        0,
+        {},
+        "wanted-host.local.",
+        addresses=[socket.inet_aton("10.0.1.2")],
+    )
+    listener = unittest.mock.Mock()
+    question = r.DNSQuestion("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN)
+    zc.async_add_listener(listener, question)
+
+    response = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+    response.add_answer_at_time(wanted.dns_pointer(), 0)
+    response.add_answer_at_time(wanted.dns_service(), 0)
+    response.add_answer_at_time(wanted.dns_addresses()[0], 0)
+    zc.record_manager.async_updates_from_response(r.DNSIncoming(response.packets()[0]))
+
+    for i in range(5):
+        response = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+        for j in range(10):
+            response.add_answer_at_time(
+                r.DNSPointer(
+                    "_airplay._tcp.local.",
+                    const._TYPE_PTR,
+                    const._CLASS_IN,
+                    const._DNS_OTHER_TTL,
+                    f"ignored{i}-{j}._airplay._tcp.local.",
+                ),
+                0,
+            )
+        zc.record_manager.async_updates_from_response(r.DNSIncoming(response.packets()[0]))
+
+    assert sum(len(records) for records in zc.cache.cache.values()) <= 20
+    assert zc.cache.evictions == 33
+    assert zc.cache.async_get_unique(wanted.dns_pointer()) is not None
+    assert zc.cache.async_get_unique(wanted.dns_service()) is not None
+    assert zc.cache.async_get_unique(wanted.dns_addresses()[0]) is not None
+
+    # Listeners are told about evicted records the same way as expired ones
+    now = current_time_millis()
+    evicted = {
+        update.new
+        for call in listener.async_update_records.call_args_list
+        for update in call[0][2]
+        if update.old is None and update.new.is_expired(now)
+    }
+    assert len(evicted) == 33
+    assert all(record.alias.startswith("ignored") for record in evicted)
+    await aiozc.async_close()
+
+
+@pytest.mark.asyncio
+async def test_interest_filter_disabled_caches_everything():
+    """Ensure all records are cached when the interest filter is disabled."""
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'])
+    zc = aiozc.zeroconf
+    info = ServiceInfo(
+        "_airplay._tcp.local.",
+        "ignored._airplay._tcp.local.",
+        80,
+        0,
+        0,
+        {},
+        "ignored-host.local.",
+        addresses=[socket.inet_aton("10.0.1.3")],
+    )
+    response = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+    response.add_answer_at_time(info.dns_pointer(), 0)
+    response.add_answer_at_time(info.dns_service(), 0)
+    zc.record_manager.async_updates_from_response(r.DNSIncoming(response.packets()[0]))
+    assert zc.cache.async_get_unique(info.dns_pointer()) is not None
+    assert zc.cache.async_get_unique(info.dns_service()) is not None
+    await aiozc.async_close()
+
+
 @pytest.mark.asyncio
 async def test_response_aggregation_timings(run_isolated):
     """Verify multicast respones are aggregated."""
@@ -1491,6 +1782,7 @@ async def test_response_aggregation_random_delay():
     assert info3.dns_pointer() not in outgoing_queue.queue[1].answers
     assert info4.dns_pointer() not in outgoing_queue.queue[1].answers
     assert info5.dns_pointer() in outgoing_queue.queue[1].answers
+    assert outgoing_queue.aggregated == 3
 
 
 @pytest.mark.asyncio
@@ -1521,13 +1813,16 @@ async def test_future_answers_are_removed_on_send():
     with unittest.mock.patch.object(_handlers, "_MULTICAST_DELAY_RANDOM_INTERVAL", (2, 2)):
         outgoing_queue.async_add(now, {info.dns_pointer(): set()})
 
-    assert len(outgoing_queue.queue) == 2
+    # The answer is already scheduled to go out sooner
+    assert len(outgoing_queue.queue) == 1
+    assert outgoing_queue.suppressed == 1
 
     with unittest.mock.patch.object(_handlers, "_MULTICAST_DELAY_RANDOM_INTERVAL", (1000, 1000)):
         outgoing_queue.async_add(now, {info2.dns_pointer(): set()})
         outgoing_queue.async_add(now, {info.dns_pointer(): set()})
 
-    assert len(outgoing_queue.queue) == 3
+    assert len(outgoing_queue.queue) == 2
+    assert outgoing_queue.suppressed == 2
 
     await asyncio.sleep(0.1)
     outgoing_queue.async_ready()
@@ -1538,3 +1833,71 @@ async def test_future_answers_are_removed_on_send():
 
     # But the one we have not sent yet shoudl still go out later
     assert info2.dns_pointer() in outgoing_queue.queue[0].answers
+
+
+def test_queued_answers_merge_additionals():
+    """Verify an answer added again keeps its place in the queue and gains the new additionals."""
+    type_ = "_mservice._tcp.local."
+    registration_name = f"xxxyyy.{type_}"
+    info = ServiceInfo(
+        type_, registration_name, 80, 0, 0, {}, "ash-1.local.", addresses=[socket.inet_aton("10.0.1.2")]
+    )
+    outgoing_queue = MulticastOutgoingQueue(unittest.mock.MagicMock(), 0, 500)
+    srv_additionals = {info.dns_service()}
+    txt_additionals = {info.dns_text()}
+
+    now = current_time_millis()
+    with unittest.mock.patch.object(_handlers, "_MULTICAST_DELAY_RANDOM_INTERVAL", (100, 100)):
+        outgoing_queue.async_add(now, {info.dns_pointer(): srv_additionals})
+    with unittest.mock.patch.object(_handlers, "_MULTICAST_DELAY_RANDOM_INTERVAL", (300, 300)):
+        outgoing_queue.async_add(now, {info.dns_pointer(): txt_additionals})
+
+    assert len(outgoing_queue.queue) == 1
+    assert outgoing_queue.queue[0].answers[info.dns_pointer()] == {info.dns_service(), info.dns_text()}
+    # The sets passed in are not modified
+    assert srv_additionals == {info.dns_service()}
+    assert outgoing_queue.suppressed == 1
+
+
+def test_packed_answers_keep_additionals_with_their_answer():
+    """Test large responses are packed into fewer packets without splitting answers from additionals."""
+    type_ = "_hap._tcp.local."
+    answers = {}
+    for i in range(300):
+        info = ServiceInfo(
+            type_,
+            f"Device number {i}.{type_}",
+            80,
+            0,
+            0,
+            {'path': '/~paulsm/', 'id': str(i)},
+            f"host-{i}.local.",
+            addresses=[socket.inet_aton(f"10.0.{i // 250}.{i % 250}")],
+        )
+        answers[info.dns_pointer()] = {info.dns_service(), info.dns_text(), *info.dns_addresses()}
+
+    greedy_packets = construct_outgoing_multicast_answers(answers).packets()
+    packets = [
+        packet for out in construct_outgoing_multicast_answers_packed(answers) for packet in out.packets()
+    ]
+    assert len(packets) < len(greedy_packets)
+    assert all(len(packet) <= const._MAX_MSG_TYPICAL for packet in packets)
+
+    answers_seen = set()
+    for packet in packets:
+        incoming = r.DNSIncoming(packet)
+        records = set(incoming.answers)
+        for record in incoming.answers:
+            if record in answers:
+                assert answers[record].issubset(records)
+                answers_seen.add(record)
+    assert answers_seen == set(answers)
+
+    # Small responses are left alone
+    small = dict(list(answers.items())[:2])
+    outs = construct_outgoing_multicast_answers_packed(small)
+    assert len(outs) == 1
+    assert outs[0].packets() == construct_outgoing_multicast_answers(small).packets()
+
+    # Nothing to send makes no packets
+    assert construct_outgoing_multicast_answers_packed({}) == []
@@ -3,7 +3,7 @@
 
 """Unit tests for _history.py."""
 
-from zeroconf._history import QuestionHistory
+from zeroconf._history import MulticastHistory, PacketHistory, QuestionHistory
 import zeroconf as r
 import zeroconf.const as const
 
@@ -66,3 +66,79 @@ def test_question_expire():
 
     # Verify the question not longer suppressed since the cache has expired
     assert not history.suppresses(question, now, other_known_answers)
+
+
+def test_packet_suppression():
+    history = PacketHistory()
+    now = r.current_time_millis()
+    source = ("10.0.0.1", 5353)
+
+    assert not history.suppresses(b"first packet", source, now)
+    assert not history.suppresses(b"other packet", source, now)
+
+    # Interleaved packets are still suppressed
+    assert history.suppresses(b"first packet", source, now + 10)
+    assert history.suppresses(b"other packet", source, now + 10)
+
+    # The same payload from another host or port is not a duplicate
+    assert not history.suppresses(b"first packet", ("10.0.0.2", 5353), now + 10)
+    assert not history.suppresses(b"first packet", ("10.0.0.1", 60000), now + 10)
+
+    # The same payload with another scope id is not a duplicate
+    assert not history.suppresses(b"first packet", ("fe80::1", 5353, 0, 1), now + 10)
+    assert history.suppresses(b"first packet", ("fe80::1", 5353, 0, 1), now + 10)
+    assert not history.suppresses(b"first packet", ("fe80::1", 5353, 0, 2), now + 10)
+
+    # Not suppressed once the window has passed
+    assert not history.suppresses(b"first packet", source, now + 1000)
+    assert history.hits == 3
+    assert history.misses == 7
+
+    # Only a hash of the payload is kept
+    assert all(isinstance(data_hash, int) for data_hash, _ in history._history)
+
+
+def test_packet_expire():
+    history = PacketHistory(max_packets=2)
+    now = r.current_time_millis()
+
+    source = ("10.0.0.1", 5353)
+
+    assert not history.suppresses(b"first packet", source, now)
+    assert not history.suppresses(b"second packet", source, now)
+    assert not history.suppresses(b"third packet", source, now)
+
+    # The oldest packet was dropped to stay within the limit
+    assert not history.suppresses(b"first packet", source, now)
+    assert history.suppresses(b"third packet", source, now)
+
+    history.async_expire(now + 1000)
+    assert not history._history
+
+
+def test_multicast_history():
+    history = MulticastHistory()
+    record = r.DNSPointer("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN, 120, 'name._hap._tcp.local.')
+    now = r.current_time_millis()
+
+    history.async_add_interface("eth0")
+    history.async_add_interface("eth1")
+    assert history.last_multicast(record) is None
+
+    # Only counts once it has gone out on every interface
+    history.async_add("eth0", [record], now)
+    assert history.last_multicast(record) is None
+    history.async_add("eth1", [record], now + 10)
+    assert history.last_multicast(record) == now
+
+    # A goodbye forgets the record
+    goodbye = r.DNSPointer("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN, 0, 'name._hap._tcp.local.')
+    history.async_add("eth0", [goodbye], now + 20)
+    assert history.last_multicast(record) is None
+
+    # Records are kept for one quarter of their TTL
+    history.async_add("eth0", [record], now)
+    history.async_expire(now + 120 * 250 - 1)
+    assert history.last_multicast(record) == now
+    history.async_expire(now + 120 * 250 + 1)
+    assert history.last_multicast(record) is None
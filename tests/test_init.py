@@ -95,7 +95,7 @@ class Names(unittest.TestCase):
             # now that we have a long packet in our possession, let's verify the
             # exception handling.
             out = r.DNSOutgoing(const._FLAGS_QR_RESPONSE | const._FLAGS_AA)
-            out.data.append(b'\0' * 10000)
+            out.data.extend(b'\0' * 10000)
 
             # mock the zeroconf logger and check for the correct logging backoff
             call_counts = mocked_log_warn.call_count, mocked_log_debug.call_count
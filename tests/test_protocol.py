@@ -13,7 +13,7 @@ import unittest.mock
 from typing import cast
 
 import zeroconf as r
-from zeroconf import DNSIncoming, const, current_time_millis
+from zeroconf import DNSIncoming, _protocol, const, current_time_millis
 from zeroconf import (
     DNSHinfo,
     DNSText,
@@ -514,6 +514,32 @@ class TestDnsIncoming(unittest.TestCase):
         assert isinstance(record, r.DNSAddress)
         assert record.address == packed
 
+    def test_incoming_lazy(self):
+        generated = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+        question = r.DNSQuestion("testname.local.", const._TYPE_SRV, const._CLASS_IN)
+        generated.add_question(question)
+        answer = r.DNSText('testname.local.', const._TYPE_TXT, const._CLASS_IN, 500, b'\x04ff=0')
+        generated.add_answer_at_time(answer, 0)
+        packet = generated.packets()[0]
+        parsed = r.DNSIncoming(packet, lazy=True)
+        assert parsed.valid is True
+        assert parsed.questions == [question]
+        assert parsed._did_read_others is False
+        assert parsed.answers == [answer]
+        assert parsed._did_read_others is True
+        assert parsed.answers == [answer]
+
+    def test_incoming_lazy_invalid_records(self):
+        generated = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+        answer = r.DNSText('testname.local.', const._TYPE_TXT, const._CLASS_IN, 500, b'\x04ff=0')
+        generated.add_answer_at_time(answer, 0)
+        # Cut the packet off in the middle of the record name
+        packet = generated.packets()[0][:16]
+        parsed = r.DNSIncoming(packet, lazy=True)
+        assert parsed.valid is True
+        assert parsed.answers == []
+        assert parsed.valid is False
+
 
 def test_dns_compression_rollback_for_corruption():
     """Verify rolling back does not lead to dns compression corruption."""
@@ -929,6 +955,71 @@ def test_dns_compression_generic_failure():
     assert len(parsed.answers) == 1
 
 
+def test_names_are_interned_across_packets():
+    """Test names and labels decoded from different packets are shared."""
+    generated = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+    generated.add_answer_at_time(
+        r.DNSPointer("_hap._tcp.local.", const._TYPE_PTR, const._CLASS_IN, 500, "Bridge._hap._tcp.local."), 0
+    )
+    packet = generated.packets()[0]
+    first = r.DNSIncoming(packet).answers[0]
+    second = r.DNSIncoming(packet).answers[0]
+    assert first is not second
+    assert first.name is second.name
+    assert first.alias is second.alias
+
+
+def test_interned_names_are_bounded():
+    """Test the intern tables do not grow without bound."""
+    with unittest.mock.patch.object(_protocol, "MAX_INTERNED_NAMES", 5), unittest.mock.patch.object(
+        _protocol, "MAX_INTERNED_LABELS", 5
+    ):
+        for i in range(20):
+            generated = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+            generated.add_question(r.DNSQuestion(f"host{i}.local.", const._TYPE_A, const._CLASS_IN))
+            parsed = r.DNSIncoming(generated.packets()[0])
+            assert parsed.questions[0].name == f"host{i}.local."
+            assert len(_protocol._interned_names) <= 5
+            assert len(_protocol._interned_labels) <= 5
+
+
+def test_name_encodings_are_cached_and_bounded():
+    """Test the encoded labels of written names are reused and do not grow without bound."""
+    with unittest.mock.patch.object(_protocol, "MAX_CACHED_NAME_ENCODINGS", 5):
+        for i in range(20):
+            generated = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+            generated.add_question(r.DNSQuestion(f"host{i}.local.", const._TYPE_A, const._CLASS_IN))
+            generated.add_question(r.DNSQuestion(f"other.host{i}.local.", const._TYPE_A, const._CLASS_IN))
+            parsed = r.DNSIncoming(generated.packets()[0])
+            assert [question.name for question in parsed.questions] == [
+                f"host{i}.local.",
+                f"other.host{i}.local.",
+            ]
+            assert len(_protocol._name_encodings) <= 5
+        assert _protocol._encode_name("other.host19.local.") is _protocol._encode_name("other.host19.local.")
+
+
+def test_name_compression_survives_rollback():
+    """Test names written for a record that did not fit are not used for compression."""
+    generated = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+    answers = [
+        r.DNSPointer(
+            "_services._dns-sd._udp.local.",
+            const._TYPE_PTR,
+            const._CLASS_IN,
+            4500,
+            f"_service{i}._sub{i}._tcp.local.",
+        )
+        for i in range(300)
+    ]
+    for answer in answers:
+        generated.add_answer_at_time(answer, 0)
+    packets = generated.packets()
+    assert len(packets) > 1
+    parsed = [record for packet in packets for record in r.DNSIncoming(packet).answers]
+    assert parsed == answers
+
+
 def test_label_length_attack():
     """Test our wire parser does not loop forever when the name exceeds 253 chars."""
     packet = (
@@ -1021,3 +1112,28 @@ def test_txt_after_invalid_nsec_name_still_usable():
         b't=2\x0emdnssequence=0'
     )
     assert len(parsed.answers) == 5
+
+
+def test_packets_sized_for_interface():
+    """Test packets can be written for different packet sizes."""
+    out = r.DNSOutgoing(const._FLAGS_QR_RESPONSE | const._FLAGS_AA)
+    for i in range(100):
+        out.add_answer_at_time(
+            r.DNSText(
+                f"device{i}._hap._tcp.local.",
+                const._TYPE_TXT,
+                const._CLASS_IN | const._CLASS_UNIQUE,
+                500,
+                b'\x0fpath=/~paulsm/',
+            ),
+            0,
+        )
+    typical = out.packets()
+    tunnel = out.packets(1232)
+    jumbo = out.packets(const._MAX_MSG_ABSOLUTE)
+    assert len(jumbo) < len(typical) < len(tunnel)
+    assert all(len(packet) <= 1232 for packet in tunnel)
+    assert out.packets(1232) is tunnel
+    assert out.packets() is typical
+    answers = [answer for packet in jumbo for answer in r.DNSIncoming(packet).answers]
+    assert answers == [answer for packet in tunnel for answer in r.DNSIncoming(packet).answers]
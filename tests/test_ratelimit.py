@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+
+"""Unit tests for _ratelimit.py."""
+
+from unittest.mock import patch
+
+import pytest
+
+from zeroconf._handlers import QuestionAnswers
+from zeroconf._ratelimit import QueryRateLimiter
+import zeroconf as r
+import zeroconf.const as const
+from zeroconf.asyncio import AsyncZeroconf
+
+
+def _query(type_: int) -> r.DNSIncoming:
+    out = r.DNSOutgoing(const._FLAGS_QR_QUERY)
+    out.add_question(r.DNSQuestion("_hap._tcp.local.", type_, const._CLASS_IN))
+    return r.DNSIncoming(out.packets()[0])
+
+
+def test_query_rate_limiter_drops_a_flood():
+    limiter = QueryRateLimiter(10, 5)
+    now = r.current_time_millis()
+    ptr_query = [_query(const._TYPE_PTR)]
+
+    assert all(limiter.async_allow("10.0.0.1", ptr_query, now) for _ in range(5))
+    assert not limiter.async_allow("10.0.0.1", ptr_query, now)
+    assert (limiter.allowed, limiter.dropped) == (5, 1)
+
+    # Other sources have their own bucket
+    assert limiter.async_allow("10.0.0.2", ptr_query, now)
+
+    # The bucket refills at the rate
+    assert not limiter.async_allow("10.0.0.1", ptr_query, now + 50)
+    assert limiter.async_allow("10.0.0.1", ptr_query, now + 100)
+    assert not limiter.async_allow("10.0.0.1", ptr_query, now + 100)
+
+
+def test_query_rate_limiter_question_costs():
+    limiter = QueryRateLimiter(10, 10)
+    now = r.current_time_millis()
+    any_query = [_query(const._TYPE_ANY)]
+
+    assert limiter.query_cost(any_query) == limiter.question_costs[const._TYPE_ANY]
+    assert limiter.query_cost([_query(const._TYPE_PTR), _query(const._TYPE_SRV)]) == 2
+    assert limiter.async_allow("10.0.0.1", any_query, now)
+    assert limiter.async_allow("10.0.0.1", any_query, now)
+    assert not limiter.async_allow("10.0.0.1", any_query, now)
+
+    # A query that costs more than the burst still needs a full bucket
+    limiter.question_costs[const._TYPE_ANY] = 100
+    assert limiter.async_allow("10.0.0.2", any_query, now)
+    assert not limiter.async_allow("10.0.0.2", any_query, now + 500)
+
+
+def test_query_rate_limiter_expire():
+    limiter = QueryRateLimiter(10, 5, max_sources=2)
+    now = r.current_time_millis()
+    ptr_query = [_query(const._TYPE_PTR)]
+
+    for source in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        limiter.async_allow(source, ptr_query, now)
+    assert list(limiter._buckets) == ["10.0.0.2", "10.0.0.3"]
+
+    limiter.async_allow("10.0.0.2", ptr_query, now + 100)
+    limiter.async_expire(now + 500)
+    assert list(limiter._buckets) == ["10.0.0.2"]
+    limiter.async_expire(now + 600)
+    assert not limiter._buckets
+
+
+def test_query_rate_limiter_rejects_rates_that_are_not_positive():
+    for rate in (0, -1):
+        with pytest.raises(ValueError):
+            QueryRateLimiter(rate)
+    with pytest.raises(ValueError):
+        QueryRateLimiter(1, burst=0)
+    with pytest.raises(ValueError):
+        r.Zeroconf(interfaces=['127.0.0.1'], query_rate_limit=0)
+
+
+def test_rate_limited_queries_are_not_answered():
+    zc = r.Zeroconf(interfaces=['127.0.0.1'], query_rate_limit=1)
+    assert zc.query_rate_limiter is not None
+    transport = zc.engine.protocols[0].transport
+    query = [_query(const._TYPE_PTR)]
+
+    no_answers = QuestionAnswers({}, {}, {}, {})
+    with patch.object(zc.query_handler, "async_response", return_value=no_answers) as async_response:
+        for _ in range(6):
+            zc.handle_assembled_query(query, "10.0.0.1", const._MDNS_PORT, transport)
+    assert async_response.call_count == 5
+    assert zc.query_rate_limiter.dropped == 1
+    zc.close()
+
+    zc = r.Zeroconf(interfaces=['127.0.0.1'])
+    assert zc.query_rate_limiter is None
+    zc.close()
+
+
+@pytest.mark.asyncio
+async def test_async_zeroconf_query_rate_limit():
+    aiozc = AsyncZeroconf(interfaces=['127.0.0.1'], query_rate_limit=10)
+    assert aiozc.zeroconf.query_rate_limiter is not None
+    assert aiozc.zeroconf.query_rate_limiter.rate == 10
+    await aiozc.async_close()
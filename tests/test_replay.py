@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+
+
+"""Unit tests for bench/replay.py."""
+
+import asyncio
+import json
+import socket
+import struct
+from unittest.mock import patch
+
+import pytest
+
+import zeroconf as r
+from zeroconf import _core, const
+from zeroconf._utils.time import current_time_millis
+
+from bench import replay
+
+_EPOCH = 1600000000.0
+
+
+def _response(name: str) -> bytes:
+    out = r.DNSOutgoing(const._FLAGS_QR_RESPONSE)
+    out.add_answer_at_time(
+        r.DNSAddress(name, const._TYPE_A, const._CLASS_IN, 120, socket.inet_aton("10.0.1.2")), 0
+    )
+    return out.packets()[0]
+
+
+def _ethernet_frame(source: str, source_port: int, dest_port: int, payload: bytes) -> bytes:
+    udp = struct.pack('!HHHH', source_port, dest_port, 8 + len(payload), 0) + payload
+    ip = (
+        struct.pack('!BBHHHBBH', 0x45, 0, 20 + len(udp), 0, 0, 255, 17, 0)
+        + socket.inet_aton(source)
+        + socket.inet_aton(const._MDNS_ADDR)
+    )
+    return b'\x01\x00\x5e\x00\x00\xfb' + b'\x00\x11\x22\x33\x44\x55' + b'\x08\x00' + ip + udp
+
+
+def _write_pcap(path, frames, endian: str, magic: int, divisor: int) -> None:
+    with open(path, 'wb') as capture:
+        capture.write(struct.pack(endian + 'IHHiIII', magic, 2, 4, 0, 0, 65535, 1))
+        for timestamp, frame in frames:
+            seconds = int(timestamp)
+            fraction = round((timestamp - seconds) * divisor)
+            capture.write(struct.pack(endian + 'IIII', seconds, fraction, len(frame), len(frame)))
+            capture.write(frame)
+
+
+@pytest.mark.parametrize(
+    "endian, magic, divisor",
+    [('<', 0xA1B2C3D4, 1000000), ('>', 0xA1B23C4D, 1000000000)],
+)
+def test_read_pcap(tmp_path, endian, magic, divisor):
+    first = _response("first.local.")
+    second = _response("second.local.")
+    path = tmp_path / "capture.pcap"
+    _write_pcap(
+        path,
+        [
+            (_EPOCH + 0.5, _ethernet_frame("10.0.0.2", const._MDNS_PORT, const._MDNS_PORT, second)),
+            # Not mDNS so it is skipped
+            (_EPOCH + 0.25, _ethernet_frame("10.0.0.3", 1234, 53, first)),
+            (_EPOCH, _ethernet_frame("10.0.0.1", 40000, const._MDNS_PORT, first)),
+        ],
+        endian,
+        magic,
+        divisor,
+    )
+    packets = replay.read_capture(str(path))
+    assert packets == [
+        replay.CapturedPacket(_EPOCH, "10.0.0.1", 40000, first),
+        replay.CapturedPacket(_EPOCH + 0.5, "10.0.0.2", const._MDNS_PORT, second),
+    ]
+
+
+def test_read_pcap_rejects_other_files(tmp_path):
+    path = tmp_path / "capture.pcap"
+    path.write_bytes(b'\x00' * 24)
+    with pytest.raises(ValueError):
+        replay.read_capture(str(path))
+
+    _write_pcap(path, [(_EPOCH, b'\x00' * 20)], '<', 0xA1B2C3D4, 1000000)
+    with open(path, 'r+b') as capture:
+        capture.seek(20)
+        capture.write(struct.pack('<I', 105))
+    with pytest.raises(ValueError):
+        replay.read_capture(str(path))
+
+
+def test_replay_json_lines_on_a_virtual_clock(tmp_path):
+    offsets = [0.0, 2.5, 1.0, 30.0]
+    path = tmp_path / "capture.jsonl"
+    with open(path, 'w') as capture:
+        for i, offset in enumerate(offsets):
+            packet = {
+                'timestamp': _EPOCH + offset,
+                'source': f"10.0.0.{i + 1}",
+                'data': _response(f"host{i}.local.").hex(),
+            }
+            capture.write(json.dumps(packet) + "\n")
+    packets = replay.read_capture(str(path))
+    assert [packet.timestamp - _EPOCH for packet in packets] == sorted(offsets)
+    assert all(packet.port == const._MDNS_PORT for packet in packets)
+
+    received = []
+
+    def _datagram_received(listener, data, addrs):
+        received.append((addrs[0], asyncio.get_running_loop().time(), _core.current_time_millis()))
+
+    with patch.object(
+        _core.AsyncListener, "datagram_received", autospec=True, side_effect=_datagram_received
+    ):
+        stats = replay.replay(packets, [], tail=5)
+
+    assert stats.packets == len(offsets)
+    assert stats.virtual_seconds == pytest.approx(35)
+    # Every packet is delivered in order at its capture time
+    assert [source for source, _, _ in received] == ["10.0.0.1", "10.0.0.3", "10.0.0.2", "10.0.0.4"]
+    for (_, loop_time, now), offset in zip(received, sorted(offsets)):
+        assert loop_time == pytest.approx(offset)
+        assert now == pytest.approx((_EPOCH + offset) * 1000)
+    # The clock is only patched while replaying
+    assert _core.current_time_millis is current_time_millis
+
+
+def test_replay_caches_the_records():
+    packets = [
+        replay.CapturedPacket(_EPOCH + i, "10.0.0.1", const._MDNS_PORT, _response(f"host{i}.local."))
+        for i in range(3)
+    ]
+    stats = replay.replay(packets, ["_http._tcp.local."], tail=1)
+    assert stats.packets == 3
+    assert stats.cache_records == 3
+    # The browser queried on the replay transport
+    assert stats.packets_sent > 0
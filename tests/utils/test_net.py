@@ -9,6 +9,7 @@ import errno
 import ifaddr
 import pytest
 import socket
+import sys
 import unittest
 
 from zeroconf._utils import net as netutils
@@ -197,3 +198,33 @@ def test_add_multicast_member():
     # No error should return True
     with patch("socket.socket.setsockopt"):
         assert netutils.add_multicast_member(sock, interface) is True
+
+
+def test_get_max_packet_size():
+    """Test the packet size follows the MTU of the interface."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock6 = socket.socket(socket.AF_INET6, socket.SOCK_DGRAM)
+    try:
+        with patch.object(netutils, "get_interface_mtu", return_value=None):
+            assert netutils.get_max_packet_size(sock) == r.const._MAX_MSG_TYPICAL
+        with patch.object(netutils, "get_interface_mtu", return_value=1420):
+            assert netutils.get_max_packet_size(sock) == 1392
+        with patch.object(netutils, "get_interface_mtu", return_value=1280):
+            assert netutils.get_max_packet_size(sock6) == 1232
+        with patch.object(netutils, "get_interface_mtu", return_value=9000):
+            assert netutils.get_max_packet_size(sock) == r.const._MAX_MSG_ABSOLUTE
+    finally:
+        sock.close()
+        sock6.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Only implemented on Linux")
+def test_get_interface_mtu_loopback():
+    """Test we can find the MTU of the loopback interface."""
+    sock = netutils.new_respond_socket('127.0.0.1')
+    assert sock is not None
+    try:
+        mtu = netutils.get_interface_mtu(sock)
+        assert mtu is not None and mtu >= 1280
+    finally:
+        sock.close()
@@ -20,8 +20,8 @@
     USA
 """
 
-import itertools
-from typing import Dict, Iterable, Iterator, List, Optional, Union, cast
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union, cast
 
 from ._dns import (
     DNSAddress,
@@ -31,7 +31,6 @@ from ._dns import (
     DNSRecord,
     DNSService,
     DNSText,
-    dns_entry_matches,
 )
 from ._utils.time import current_time_millis
 from .const import _TYPE_PTR
@@ -39,30 +38,88 @@ from .const import _TYPE_PTR
 _UNIQUE_RECORD_TYPES = (DNSAddress, DNSHinfo, DNSPointer, DNSText, DNSService)
 _UniqueRecordsType = Union[DNSAddress, DNSHinfo, DNSPointer, DNSText, DNSService]
 _DNSRecordCacheType = Dict[str, Dict[DNSRecord, DNSRecord]]
+_DNSRecordDetailsCacheType = Dict[Tuple[str, int, int], Dict[DNSRecord, DNSRecord]]
+_KeyT = TypeVar('_KeyT', str, Tuple[str, int, int])
+_EMPTY_RECORDS: Dict[DNSRecord, DNSRecord] = {}
+# The heap of expiration times is rebuilt when it holds this many
+# times more entries than there are records in the cache
+_MAX_STALE_EXPIRATIONS_FACTOR = 2
+_MIN_EXPIRATIONS_TO_REBUILD = 64
 
 
-def _remove_key(cache: _DNSRecordCacheType, key: str, entry: DNSRecord) -> None:
-    """Remove a key from a DNSRecord cache
+def _copy_bucket(
+    cache: Dict[_KeyT, Dict[DNSRecord, DNSRecord]],
+    key: _KeyT,
+    copies: Dict[_KeyT, Dict[DNSRecord, DNSRecord]],
+) -> Dict[DNSRecord, DNSRecord]:
+    """Return a copy of the records in a DNSRecord cache bucket that can be changed.
+
+    The bucket is only copied the first time it is changed in a batch.
+
+    This function must be run in from event loop.
+    """
+    bucket = copies.get(key)
+    if bucket is None:
+        bucket = copies[key] = dict(cache.get(key, _EMPTY_RECORDS))
+    return bucket
+
+
+def _swap_buckets(
+    cache: Dict[_KeyT, Dict[DNSRecord, DNSRecord]], copies: Dict[_KeyT, Dict[DNSRecord, DNSRecord]]
+) -> None:
+    """Replace the buckets of a DNSRecord cache with their changed copies.
 
     This function must be run in from event loop.
     """
-    del cache[key][entry]
-    if not cache[key]:
-        del cache[key]
+    for key, bucket in copies.items():
+        if bucket:
+            cache[key] = bucket
+        else:
+            cache.pop(key, None)
 
 
 class DNSCache:
-    """A cache of DNS entries."""
+    """A cache of DNS entries.
+
+    The records for each name are kept in buckets that are never changed
+    once they are in the cache. Changes are made to a copy of the bucket
+    which then replaces it, so threads can read a bucket without copying
+    it while the event loop updates the cache.
 
-    def __init__(self) -> None:
+    If max_records is set, the cache evicts records when it holds
+    more than max_records.
+    """
+
+    def __init__(self, max_records: Optional[int] = None) -> None:
+        self.max_records = max_records
+        self.evictions = 0
         self.cache: _DNSRecordCacheType = {}
         self.service_cache: _DNSRecordCacheType = {}
+        # The records for each (key, type, class) so lookups by details
+        # only touch the matching records
+        self._details_cache: _DNSRecordDetailsCacheType = {}
+        # The expiration time each record was scheduled for and a heap
+        # of (expiration time, id, record) so expiring only has to look at
+        # the records that are due. Entries left in the heap after their
+        # record was removed or rescheduled are skipped.
+        self._expirations: Dict[DNSRecord, float] = {}
+        self._expire_heap: List[Tuple[float, int, DNSRecord]] = []
+        # Records eviction passed over because someone was interested in
+        # them. They are only evicted once nothing else is left and are
+        # moved back to the expire heap when it is rebuilt.
+        self._evict_last_heap: List[Tuple[float, int, DNSRecord]] = []
 
     # Functions prefixed with async_ are NOT threadsafe and must
     # be run in the event loop.
 
-    def _async_add(self, entry: DNSRecord) -> None:
-        """Adds an entry.
+    def _async_add(
+        self,
+        entry: DNSRecord,
+        records: _DNSRecordCacheType,
+        services: _DNSRecordCacheType,
+        details: _DNSRecordDetailsCacheType,
+    ) -> None:
+        """Adds an entry to copies of the buckets it belongs in.
 
         This function must be run in from event loop.
         """
@@ -72,44 +129,186 @@ class DNSCache:
         # replaces any existing records that are __eq__ to each other which
         # removes the risk that accessing the cache from the wrong
         # direction would return the old incorrect entry.
-        self.cache.setdefault(entry.key, {})[entry] = entry
+        _copy_bucket(self.cache, entry.key, records)[entry] = entry
         if isinstance(entry, DNSService):
-            self.service_cache.setdefault(entry.server, {})[entry] = entry
+            _copy_bucket(self.service_cache, entry.server, services)[entry] = entry
+        details_bucket = _copy_bucket(self._details_cache, (entry.key, entry.type, entry.class_), details)
+        # Replace the key as well so the index only holds current records
+        details_bucket.pop(entry, None)
+        details_bucket[entry] = entry
+        self._async_schedule_expire(entry)
+
+    def _async_schedule_expire(self, entry: DNSRecord) -> None:
+        """Schedule a record to expire at its expiration time.
+
+        This function must be run in from event loop.
+        """
+        when = entry.get_expiration_time(100)
+        expirations = self._expirations
+        # Replace the key as well so a heap rebuild uses the current record
+        expirations.pop(entry, None)
+        expirations[entry] = when
+        heap = self._expire_heap
+        heap_size = len(heap) + len(self._evict_last_heap)
+        if heap_size > max(_MIN_EXPIRATIONS_TO_REBUILD, _MAX_STALE_EXPIRATIONS_FACTOR * len(expirations)):
+            # Too many entries are stale, rebuild the heap without them
+            heap[:] = [(when_, id(record), record) for record, when_ in expirations.items()]
+            heapq.heapify(heap)
+            self._evict_last_heap.clear()
+        else:
+            heapq.heappush(heap, (when, id(entry), entry))
 
     def async_add_records(self, entries: Iterable[DNSRecord]) -> None:
         """Add multiple records.
 
         This function must be run in from event loop.
         """
+        records: _DNSRecordCacheType = {}
+        services: _DNSRecordCacheType = {}
+        details: _DNSRecordDetailsCacheType = {}
         for entry in entries:
-            self._async_add(entry)
-
-    def _async_remove(self, entry: DNSRecord) -> None:
-        """Removes an entry.
+            self._async_add(entry, records, services, details)
+        self._async_swap_buckets(records, services, details)
+
+    def _async_remove(
+        self,
+        entry: DNSRecord,
+        records: _DNSRecordCacheType,
+        services: _DNSRecordCacheType,
+        details: _DNSRecordDetailsCacheType,
+    ) -> None:
+        """Removes an entry from copies of the buckets it belongs in.
 
         This function must be run in from event loop.
         """
         if isinstance(entry, DNSService):
-            _remove_key(self.service_cache, entry.server, entry)
-        _remove_key(self.cache, entry.key, entry)
+            del _copy_bucket(self.service_cache, entry.server, services)[entry]
+        del _copy_bucket(self.cache, entry.key, records)[entry]
+        del _copy_bucket(self._details_cache, (entry.key, entry.type, entry.class_), details)[entry]
+        self._expirations.pop(entry, None)
+
+    def _async_swap_buckets(
+        self,
+        records: _DNSRecordCacheType,
+        services: _DNSRecordCacheType,
+        details: _DNSRecordDetailsCacheType,
+    ) -> None:
+        """Replace the changed buckets in the cache.
+
+        This function must be run in from event loop.
+        """
+        _swap_buckets(self.cache, records)
+        _swap_buckets(self.service_cache, services)
+        _swap_buckets(self._details_cache, details)
 
     def async_remove_records(self, entries: Iterable[DNSRecord]) -> None:
         """Remove multiple records.
 
         This function must be run in from event loop.
         """
+        records: _DNSRecordCacheType = {}
+        services: _DNSRecordCacheType = {}
+        details: _DNSRecordDetailsCacheType = {}
         for entry in entries:
-            self._async_remove(entry)
+            self._async_remove(entry, records, services, details)
+        self._async_swap_buckets(records, services, details)
+
+    def async_set_created_ttl(self, entry: DNSRecord, created: float, ttl: Union[float, int]) -> None:
+        """Set the created and ttl of a record in the cache and reschedule its expiration.
+
+        Records in the cache must be updated with this method, or
+        async_reset_ttl, for them to expire on time when their
+        expiration time moves sooner.
+
+        This function must be run in from event loop.
+        """
+        entry.set_created_ttl(created, ttl)
+        if self.cache.get(entry.key, {}).get(entry) is entry:
+            self._async_schedule_expire(entry)
+
+    def async_reset_ttl(self, entry: DNSRecord, other: DNSRecord) -> None:
+        """Set the created and ttl of a record in the cache to that of another record.
+
+        This function must be run in from event loop.
+        """
+        self.async_set_created_ttl(entry, other.created, other.ttl)
 
     def async_expire(self, now: float) -> List[DNSRecord]:
         """Purge expired entries from the cache.
 
+        Only the records whose expiration time has passed are looked at.
+
         This function must be run in from event loop.
         """
-        expired = [record for record in itertools.chain(*self.cache.values()) if record.is_expired(now)]
+        expirations = self._expirations
+        expired: List[DNSRecord] = []
+        for heap in (self._expire_heap, self._evict_last_heap):
+            while heap and heap[0][0] <= now:
+                when, _, record = heapq.heappop(heap)
+                if not self._async_is_scheduled(record, when):
+                    continue
+                if record.is_expired(now):
+                    del expirations[record]
+                    expired.append(record)
+                else:
+                    # The ttl was extended without telling the cache
+                    self._async_schedule_expire(record)
         self.async_remove_records(expired)
         return expired
 
+    def _async_is_scheduled(self, record: DNSRecord, when: float) -> bool:
+        """Check if a heap entry is still current.
+
+        Entries go stale when their record is removed, replaced or rescheduled.
+
+        This function must be run in from event loop.
+        """
+        return self._expirations.get(record) == when and self.cache.get(record.key, {}).get(record) is record
+
+    def async_evict(self, is_interesting: Callable[[DNSRecord], bool]) -> List[DNSRecord]:
+        """Evict records until the cache holds no more than max_records.
+
+        The records closest to expiry are evicted first. Records
+        is_interesting returns True for are only evicted once there
+        is nothing else left to evict.
+
+        Evicted records are marked as expired so listeners treat
+        them the same way as records that expired.
+
+        This function must be run in from event loop.
+        """
+        if self.max_records is None:
+            return []
+        excess = len(self._expirations) - self.max_records
+        if excess <= 0:
+            return []
+
+        heap = self._expire_heap
+        evict_last_heap = self._evict_last_heap
+        evicted: List[DNSRecord] = []
+        while heap and len(evicted) < excess:
+            heap_entry = heapq.heappop(heap)
+            when, _, record = heap_entry
+            if not self._async_is_scheduled(record, when):
+                continue
+            if is_interesting(record):
+                heapq.heappush(evict_last_heap, heap_entry)
+                continue
+            del self._expirations[record]
+            evicted.append(record)
+        # Only evict records someone is interested in as a last resort
+        while evict_last_heap and len(evicted) < excess:
+            when, _, record = heapq.heappop(evict_last_heap)
+            if self._async_is_scheduled(record, when):
+                del self._expirations[record]
+                evicted.append(record)
+
+        self.async_remove_records(evicted)
+        for record in evicted:
+            record.set_created_ttl(record.created, 0)
+        self.evictions += len(evicted)
+        return evicted
+
     def async_get_unique(self, entry: _UniqueRecordsType) -> Optional[DNSRecord]:
         """Gets a unique entry by key.  Will return None if there is no
         matching entry.
@@ -125,10 +324,7 @@ class DNSCache:
         This function is not threadsafe and must be called from
         the event loop.
         """
-        key = name.lower()
-        for entry in self.cache.get(key, []):
-            if dns_entry_matches(entry, key, type_, class_):
-                yield entry
+        return iter(self._details_cache.get((name.lower(), type_, class_), _EMPTY_RECORDS))
 
     def async_entries_with_name(self, name: str) -> Dict[DNSRecord, DNSRecord]:
         """Returns a dict of entries whose key matches the name.
@@ -147,18 +343,20 @@ class DNSCache:
         return self.service_cache.get(name.lower(), {})
 
     # The below functions are threadsafe and do not need to be run in the
-    # event loop, however they all make copies so they significantly
-    # inefficent
+    # event loop. Buckets in the cache are never changed so they can be
+    # read without making a copy first.
 
     def get(self, entry: DNSEntry) -> Optional[DNSRecord]:
         """Gets an entry by key.  Will return None if there is no
         matching entry."""
+        records = self.cache.get(entry.key, _EMPTY_RECORDS)
         if isinstance(entry, _UNIQUE_RECORD_TYPES):
-            return self.cache.get(entry.key, {}).get(entry)
-        for cached_entry in reversed(list(self.cache.get(entry.key, []))):
+            return records.get(entry)
+        match: Optional[DNSRecord] = None
+        for cached_entry in records:
             if entry.__eq__(cached_entry):
-                return cached_entry
-        return None
+                match = cached_entry
+        return match
 
     def get_by_details(self, name: str, type_: int, class_: int) -> Optional[DNSRecord]:
         """Gets the first matching entry by details. Returns None if no entries match.
@@ -172,37 +370,34 @@ class DNSCache:
 
         Use get_all_by_details instead.
         """
-        key = name.lower()
-        for cached_entry in reversed(list(self.cache.get(key, []))):
-            if dns_entry_matches(cached_entry, key, type_, class_):
-                return cached_entry
-        return None
+        last: Optional[DNSRecord] = None
+        for last in self._details_cache.get((name.lower(), type_, class_), _EMPTY_RECORDS):
+            pass
+        return last
 
     def get_all_by_details(self, name: str, type_: int, class_: int) -> List[DNSRecord]:
         """Gets all matching entries by details."""
-        key = name.lower()
-        return [
-            entry for entry in list(self.cache.get(key, [])) if dns_entry_matches(entry, key, type_, class_)
-        ]
+        return list(self._details_cache.get((name.lower(), type_, class_), _EMPTY_RECORDS))
 
     def entries_with_server(self, server: str) -> List[DNSRecord]:
         """Returns a list of entries whose server matches the name."""
-        return list(self.service_cache.get(server.lower(), []))
+        return list(self.service_cache.get(server.lower(), _EMPTY_RECORDS))
 
     def entries_with_name(self, name: str) -> List[DNSRecord]:
         """Returns a list of entries whose key matches the name."""
-        return list(self.cache.get(name.lower(), []))
+        return list(self.cache.get(name.lower(), _EMPTY_RECORDS))
 
     def current_entry_with_name_and_alias(self, name: str, alias: str) -> Optional[DNSRecord]:
         now = current_time_millis()
-        for record in reversed(self.entries_with_name(name)):
+        match: Optional[DNSRecord] = None
+        for record in self.cache.get(name.lower(), _EMPTY_RECORDS):
             if (
                 record.type == _TYPE_PTR
                 and not record.is_expired(now)
                 and cast(DNSPointer, record).alias == alias
             ):
-                return record
-        return None
+                match = record
+        return match
 
     def names(self) -> List[str]:
         """Return a copy of the list of current cache names."""
@@ -21,29 +21,32 @@
 """
 
 import asyncio
+import functools
 import itertools
 import random
 import socket
 import sys
 import threading
 from types import TracebackType  # noqa # used in type hints
-from typing import Awaitable, Dict, List, Optional, Tuple, Type, Union, cast
+from typing import Awaitable, Dict, List, Optional, Set, Tuple, Type, Union, cast
 
 from ._cache import DNSCache
-from ._dns import DNSQuestion, DNSQuestionType
+from ._dns import DNSQuestion, DNSQuestionType, DNSRecord
 from ._exceptions import NonUniqueNameException
 from ._handlers import (
     MulticastOutgoingQueue,
     QueryHandler,
     RecordManager,
-    construct_outgoing_multicast_answers,
+    _AnswerWithAdditionalsType,
+    construct_outgoing_multicast_answers_packed,
     construct_outgoing_unicast_answers,
 )
-from ._history import QuestionHistory
+from ._history import MulticastHistory, PacketHistory, QuestionHistory
 from ._logger import QuietLogger, log
 from ._protocol import DNSIncoming, DNSOutgoing
+from ._ratelimit import QueryRateLimiter
 from ._services import ServiceListener
-from ._services.browser import ServiceBrowser
+from ._services.browser import ServiceBrowser, SharedQueryScheduler
 from ._services.info import ServiceInfo, instance_name_from_service_info
 from ._services.registry import ServiceRegistry
 from ._updates import RecordUpdate, RecordUpdateListener
@@ -62,6 +65,7 @@ from ._utils.net import (
     autodetect_ip_version,
     can_send_to,
     create_sockets,
+    get_max_packet_size,
 )
 from ._utils.time import current_time_millis, millis_to_seconds
 from .const import (
@@ -73,11 +77,13 @@ from .const import (
     _FLAGS_QR_QUERY,
     _FLAGS_QR_RESPONSE,
     _MAX_MSG_ABSOLUTE,
+    _MAX_MSG_TYPICAL,
     _MDNS_ADDR,
     _MDNS_ADDR6,
     _MDNS_PORT,
     _ONE_SECOND,
     _REGISTER_TIME,
+    _SERVICE_TYPE_ENUMERATION_NAME,
     _TYPE_PTR,
     _UNREGISTER_TIME,
 )
@@ -101,6 +107,10 @@ _PROTECTED_AGGREGATION_DELAY = 200  # ms
 _CLOSE_TIMEOUT = 3000  # ms
 _REGISTER_BROADCASTS = 3
 
+# The maximum number of datagrams read from a socket in one
+# event loop turn before yielding to other work
+_MAX_BURST_DATAGRAMS = 64
+
 
 class AsyncEngine:
     """An engine wraps sockets in the event loop."""
@@ -116,6 +126,8 @@ class AsyncEngine:
         self.protocols: List[AsyncListener] = []
         self.readers: List[asyncio.DatagramTransport] = []
         self.senders: List[asyncio.DatagramTransport] = []
+        # The largest packet each sender can send without IP fragmentation
+        self.max_packet_sizes: Dict[asyncio.DatagramTransport, int] = {}
         self._listen_socket = listen_socket
         self._respond_sockets = respond_sockets
         self._cleanup_timer: Optional[asyncio.TimerHandle] = None
@@ -157,17 +169,28 @@ class AsyncEngine:
                 reader_sockets.append(s)
             sender_sockets.append(s)
 
+        # Draining the socket directly is only safe when the loop
+        # waits for readiness instead of using overlapped reads
+        drain = isinstance(loop, asyncio.SelectorEventLoop)
         for s in reader_sockets:
-            transport, protocol = await loop.create_datagram_endpoint(lambda: AsyncListener(self.zc), sock=s)
+            transport, protocol = await loop.create_datagram_endpoint(
+                functools.partial(AsyncListener, self.zc, s if drain else None), sock=s
+            )
             self.protocols.append(cast(AsyncListener, protocol))
             self.readers.append(cast(asyncio.DatagramTransport, transport))
             if s in sender_sockets:
                 self.senders.append(cast(asyncio.DatagramTransport, transport))
+                self.max_packet_sizes[cast(asyncio.DatagramTransport, transport)] = get_max_packet_size(s)
+                self.zc.multicast_history.async_add_interface(transport)
 
     def _async_cache_cleanup(self) -> None:
         """Periodic cache cleanup."""
         now = current_time_millis()
         self.zc.question_history.async_expire(now)
+        self.zc.packet_history.async_expire(now)
+        self.zc.multicast_history.async_expire(now)
+        if self.zc.query_rate_limiter:
+            self.zc.query_rate_limiter.async_expire(now)
         self.zc.record_manager.async_updates(
             now, [RecordUpdate(record, None) for record in self.zc.cache.async_expire(now)]
         )
@@ -210,10 +233,9 @@ class AsyncListener(asyncio.Protocol, QuietLogger):
     It requires registration with an Engine object in order to have
     the read() method called when a socket is available for reading."""
 
-    def __init__(self, zc: 'Zeroconf') -> None:
+    def __init__(self, zc: 'Zeroconf', sock: Optional[socket.socket] = None) -> None:
         self.zc = zc
-        self.data: Optional[bytes] = None
-        self.last_time: float = 0
+        self.sock = sock
         self.transport: Optional[asyncio.DatagramTransport] = None
         self.sock_name: Optional[str] = None
         self.sock_fileno: Optional[int] = None
@@ -222,16 +244,43 @@ class AsyncListener(asyncio.Protocol, QuietLogger):
 
         super().__init__()
 
-    def suppress_duplicate_packet(self, data: bytes, now: float) -> bool:
-        """Suppress duplicate packet if the last one was the same in the last second."""
-        if self.data == data and (now - 1000) < self.last_time:
-            return True
-        self.data = data
-        self.last_time = now
-        return False
+    def suppress_duplicate_packet(
+        self,
+        data: bytes,
+        now: float,
+        addrs: Union[Tuple[()], Tuple[str, int], Tuple[str, int, int, int]] = (),
+    ) -> bool:
+        """Suppress duplicate packet if addrs sent the same one to any socket in the last second."""
+        return self.zc.packet_history.suppresses(data, addrs, now)
 
     def datagram_received(
         self, data: bytes, addrs: Union[Tuple[str, int], Tuple[str, int, int, int]]
+    ) -> None:
+        """Handle a datagram and any others already waiting on the socket.
+
+        Responses from the whole burst are processed as a single update
+        so listeners are only notified once.
+        """
+        responses: List[DNSIncoming] = []
+        self._process_datagram(data, addrs, responses)
+        if self.sock is not None:
+            for _ in range(_MAX_BURST_DATAGRAMS - 1):
+                try:
+                    data, addrs = self.sock.recvfrom(_MAX_MSG_ABSOLUTE + 1)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as exc:
+                    self.error_received(exc)
+                    break
+                self._process_datagram(data, addrs, responses)
+        if responses:
+            self.zc.handle_responses(responses)
+
+    def _process_datagram(
+        self,
+        data: bytes,
+        addrs: Union[Tuple[str, int], Tuple[str, int, int, int]],
+        responses: List[DNSIncoming],
     ) -> None:
         assert self.transport is not None
         v6_flow_scope: Union[Tuple[()], Tuple[int, int]] = ()
@@ -246,7 +295,7 @@ class AsyncListener(asyncio.Protocol, QuietLogger):
             v6_flow_scope = (flow, scope)
 
         now = current_time_millis()
-        if self.suppress_duplicate_packet(data, now):
+        if self.suppress_duplicate_packet(data, now, addrs):
             # Guard against duplicate packets
             log.debug(
                 'Ignoring duplicate message received from %r:%r [socket %s] (%d bytes) as [%r]',
@@ -269,7 +318,9 @@ class AsyncListener(asyncio.Protocol, QuietLogger):
             )
             return
 
-        msg = DNSIncoming(data, scope, now)
+        # The records are only decoded once something needs them so
+        # packets that end up being ignored only cost the header and questions
+        msg = DNSIncoming(data, scope, now, lazy=True)
         if msg.valid:
             log.debug(
                 'Received from %r:%r [socket %s]: %r (%d bytes) as [%r]',
@@ -292,11 +343,36 @@ class AsyncListener(asyncio.Protocol, QuietLogger):
             return
 
         if not msg.is_query():
-            self.zc.handle_response(msg)
+            responses.append(msg)
+            return
+
+        # The known answers are only decoded for queries we could answer
+        # so the records of queries for other hosts are never parsed
+        if not self._query_is_relevant(msg, addr):
+            return
+
+        # Known answers change what we respond with so they are decoded
+        # before answering and a query with corrupt records is dropped
+        if not msg.answers and not msg.valid:
             return
 
         self.handle_query_or_defer(msg, addr, port, self.transport, v6_flow_scope)
 
+    def _query_is_relevant(self, msg: DNSIncoming, addr: str) -> bool:
+        """Check if a query asks about names we answer for or are tracking."""
+        if addr in self._deferred:
+            # The rest of a truncated query may only carry known answers
+            return True
+        registry = self.zc.registry
+        record_manager = self.zc.record_manager
+        for question in msg.questions:
+            name = question.name.lower()
+            if record_manager.async_has_interest(name):
+                return True
+            if name == _SERVICE_TYPE_ENUMERATION_NAME and registry.types:
+                return True
+        return False
+
     def handle_query_or_defer(
         self,
         msg: DNSIncoming,
@@ -381,6 +457,9 @@ class Zeroconf(QuietLogger):
         unicast: bool = False,
         ip_version: Optional[IPVersion] = None,
         apple_p2p: bool = False,
+        interest_filter: bool = False,
+        query_rate_limit: Optional[float] = None,
+        cache_max_records: Optional[int] = None,
     ) -> None:
         """Creates an instance of the Zeroconf class, establishing
         multicast communications, listening and reaping threads.
@@ -396,6 +475,15 @@ class Zeroconf(QuietLogger):
         :param ip_version: IP versions to support. If `choice` is a list, the default is detected
             from it. Otherwise defaults to V4 only for backward compatibility.
         :param apple_p2p: use AWDL interface (only macOS)
+        :param interest_filter: only cache records that browsers, listeners
+            or registered services are interested in
+        :param query_rate_limit: the cost of queries answered per second
+            for each source address, or None to answer every query. Queries
+            relayed by an mDNS reflector all count against the reflector's address.
+            Raises ValueError if it is not greater than zero
+        :param cache_max_records: the most records to cache, or None for no limit.
+            Records nobody is interested in and records closest to expiry are
+            evicted first
         """
         if ip_version is None:
             ip_version = autodetect_ip_version(interfaces)
@@ -406,6 +494,11 @@ class Zeroconf(QuietLogger):
         if apple_p2p and sys.platform != 'darwin':
             raise RuntimeError('Option `apple_p2p` is not supported on non-Apple platforms.')
 
+        # Created before the sockets since it validates query_rate_limit
+        self.query_rate_limiter: Optional[QueryRateLimiter] = None
+        if query_rate_limit is not None:
+            self.query_rate_limiter = QueryRateLimiter(query_rate_limit)
+
         self.unicast = unicast
         listen_socket, respond_sockets = create_sockets(interfaces, unicast, ip_version, apple_p2p=apple_p2p)
         log.debug('Listen socket %s, respond sockets %s', listen_socket, respond_sockets)
@@ -414,10 +507,15 @@ class Zeroconf(QuietLogger):
 
         self.browsers: Dict[ServiceListener, ServiceBrowser] = {}
         self.registry = ServiceRegistry()
-        self.cache = DNSCache()
+        self.cache = DNSCache(cache_max_records)
         self.question_history = QuestionHistory()
-        self.query_handler = QueryHandler(self.registry, self.cache, self.question_history)
-        self.record_manager = RecordManager(self)
+        self.packet_history = PacketHistory()
+        self.multicast_history = MulticastHistory()
+        self.query_handler = QueryHandler(
+            self.registry, self.cache, self.question_history, self.multicast_history
+        )
+        self.record_manager = RecordManager(self, interest_filter)
+        self.browser_query_scheduler = SharedQueryScheduler(self)
 
         self.notify_event: Optional[asyncio.Event] = None
         self.loop: Optional[asyncio.AbstractEventLoop] = None
@@ -555,6 +653,32 @@ class Zeroconf(QuietLogger):
         self.registry.async_add(info)
         return asyncio.ensure_future(self._async_broadcast_service(info, _REGISTER_TIME, None))
 
+    async def async_register_services(
+        self,
+        infos: List[ServiceInfo],
+        ttl: Optional[int] = None,
+        allow_name_change: bool = False,
+        cooperating_responders: bool = False,
+    ) -> Awaitable:
+        """Registers many services at once.
+
+        The names are probed together and the services are announced
+        together, packed into as few packets as possible. This is much
+        faster than registering the services one at a time.
+
+        If a name is not unique, NonUniqueNameException is raised and
+        none of the services are registered.
+        """
+        if ttl is not None:
+            for info in infos:
+                info.host_ttl = ttl
+                info.other_ttl = ttl
+
+        await self.async_wait_for_start()
+        await self.async_check_services(infos, allow_name_change, cooperating_responders)
+        self.registry.async_add(infos)
+        return asyncio.ensure_future(self._async_broadcast_services(infos, _REGISTER_TIME, None))
+
     def update_service(self, info: ServiceInfo) -> None:
         """Registers service information to the network with a default TTL.
         Zeroconf will then respond to requests for information for that
@@ -584,6 +708,30 @@ class Zeroconf(QuietLogger):
                 await asyncio.sleep(millis_to_seconds(interval))
             self.async_send(self.generate_service_broadcast(info, ttl, broadcast_addresses))
 
+    async def _async_broadcast_services(
+        self,
+        infos: List[ServiceInfo],
+        interval: int,
+        ttl: Optional[int],
+        shared_servers: Optional[Set[str]] = None,
+    ) -> None:
+        """Send broadcasts to announce many services at intervals.
+
+        Address records are not sent for the servers in shared_servers.
+        """
+        if not infos:
+            return
+        for i in range(_REGISTER_BROADCASTS):
+            if i != 0:
+                await asyncio.sleep(millis_to_seconds(interval))
+            now = current_time_millis()
+            answers: _AnswerWithAdditionalsType = {}
+            for info in infos:
+                broadcast_addresses = not shared_servers or info.server not in shared_servers
+                for record in self._broadcast_records(info, ttl, broadcast_addresses, now):
+                    answers[record] = set()
+            self.async_send_multicast_answers(answers)
+
     def generate_service_broadcast(
         self,
         info: ServiceInfo,
@@ -597,7 +745,12 @@ class Zeroconf(QuietLogger):
 
     def generate_service_query(self, info: ServiceInfo) -> DNSOutgoing:  # pylint: disable=no-self-use
         """Generate a query to lookup a service."""
+        return self.generate_services_query([info])
+
+    def generate_services_query(self, infos: List[ServiceInfo]) -> DNSOutgoing:  # pylint: disable=no-self-use
+        """Generate a query to probe for many services at once."""
         out = DNSOutgoing(_FLAGS_QR_QUERY | _FLAGS_AA)
+        now = current_time_millis()
         # https://datatracker.ietf.org/doc/html/rfc6762#section-8.1
         # Because of the mDNS multicast rate-limiting
         # rules, the probes SHOULD be sent as "QU" questions with the unicast-
@@ -606,8 +759,10 @@ class Zeroconf(QuietLogger):
         # via multicast.
         #
         # _CLASS_UNIQUE is the "QU" bit
-        out.add_question(DNSQuestion(info.type, _TYPE_PTR, _CLASS_IN | _CLASS_UNIQUE))
-        out.add_authorative_answer(info.dns_pointer(created=current_time_millis()))
+        for type_ in {info.type: None for info in infos}:
+            out.add_question(DNSQuestion(type_, _TYPE_PTR, _CLASS_IN | _CLASS_UNIQUE))
+        for info in infos:
+            out.add_authorative_answer(info.dns_pointer(created=now))
         return out
 
     def _add_broadcast_answer(  # pylint: disable=no-self-use
@@ -618,15 +773,27 @@ class Zeroconf(QuietLogger):
         broadcast_addresses: bool = True,
     ) -> None:
         """Add answers to broadcast a service."""
-        now = current_time_millis()
+        for record in self._broadcast_records(info, override_ttl, broadcast_addresses, current_time_millis()):
+            out.add_answer_at_time(record, 0)
+
+    def _broadcast_records(  # pylint: disable=no-self-use
+        self,
+        info: ServiceInfo,
+        override_ttl: Optional[int],
+        broadcast_addresses: bool,
+        now: float,
+    ) -> List[DNSRecord]:
+        """Return the records to broadcast a service."""
         other_ttl = info.other_ttl if override_ttl is None else override_ttl
         host_ttl = info.host_ttl if override_ttl is None else override_ttl
-        out.add_answer_at_time(info.dns_pointer(override_ttl=other_ttl, created=now), 0)
-        out.add_answer_at_time(info.dns_service(override_ttl=host_ttl, created=now), 0)
-        out.add_answer_at_time(info.dns_text(override_ttl=other_ttl, created=now), 0)
+        records: List[DNSRecord] = [
+            info.dns_pointer(override_ttl=other_ttl, created=now),
+            info.dns_service(override_ttl=host_ttl, created=now),
+            info.dns_text(override_ttl=other_ttl, created=now),
+        ]
         if broadcast_addresses:
-            for dns_address in info.dns_addresses(override_ttl=host_ttl, created=now):
-                out.add_answer_at_time(dns_address, 0)
+            records.extend(info.dns_addresses(override_ttl=host_ttl, created=now))
+        return records
 
     def unregister_service(self, info: ServiceInfo) -> None:
         """Unregister a service."""
@@ -647,6 +814,23 @@ class Zeroconf(QuietLogger):
             self._async_broadcast_service(info, _UNREGISTER_TIME, 0, broadcast_addresses)
         )
 
+    async def async_unregister_services(self, infos: List[ServiceInfo]) -> Awaitable:
+        """Unregister many services at once.
+
+        The goodbyes for all of the services are packed into as few
+        packets as possible. Use the registry to select the services
+        to withdraw, for example all the services of one type with
+        registry.async_get_infos_type or on one server with
+        registry.async_get_infos_server.
+        """
+        self.registry.async_remove(infos)
+        # If another server uses the same addresses, we do not want to send
+        # goodbye packets for the address records
+        shared_servers = {info.server for info in infos if self.registry.async_get_infos_server(info.server)}
+        return asyncio.ensure_future(
+            self._async_broadcast_services(infos, _UNREGISTER_TIME, 0, shared_servers)
+        )
+
     def generate_unregister_all_services(self) -> Optional[DNSOutgoing]:
         """Generate a DNSOutgoing goodbye for all services and remove them from the registry."""
         service_infos = self.registry.async_get_service_infos()
@@ -692,27 +876,83 @@ class Zeroconf(QuietLogger):
         next_instance_number = 2
         next_time = now = current_time_millis()
         i = 0
-        while i < _REGISTER_BROADCASTS:
-            # check for a name conflict
-            while self.cache.current_entry_with_name_and_alias(info.type, info.name):
-                if not allow_name_change:
-                    raise NonUniqueNameException
-
-                # change the name and look for a conflict
-                info.name = f'{instance_name}-{next_instance_number}.{info.type}'
-                next_instance_number += 1
-                service_type_name(info.name)
-                next_time = now
-                i = 0
-
-            if now < next_time:
-                await self.async_wait(next_time - now)
-                now = current_time_millis()
-                continue
-
-            self.async_send(self.generate_service_query(info))
-            i += 1
-            next_time += _CHECK_TIME
+        # Make sure conflicting answers are cached when filtering on interest
+        self.record_manager.async_add_interest([info.type])
+        try:
+            while i < _REGISTER_BROADCASTS:
+                # check for a name conflict
+                while self.cache.current_entry_with_name_and_alias(info.type, info.name):
+                    if not allow_name_change:
+                        raise NonUniqueNameException
+
+                    # change the name and look for a conflict
+                    info.name = f'{instance_name}-{next_instance_number}.{info.type}'
+                    next_instance_number += 1
+                    service_type_name(info.name)
+                    next_time = now
+                    i = 0
+
+                if now < next_time:
+                    await self.async_wait(next_time - now)
+                    now = current_time_millis()
+                    continue
+
+                self.async_send(self.generate_service_query(info))
+                i += 1
+                next_time += _CHECK_TIME
+        finally:
+            self.record_manager.async_remove_interest([info.type])
+
+    async def async_check_services(
+        self, infos: List[ServiceInfo], allow_name_change: bool, cooperating_responders: bool = False
+    ) -> None:
+        """Checks the network for unique service names, probing for all
+        of them together and modifying the ServiceInfos passed in whose
+        names are not unique."""
+        if cooperating_responders:
+            return
+        instance_names = {id(info): instance_name_from_service_info(info) for info in infos}
+        next_instance_numbers = dict.fromkeys(instance_names, 2)
+        # The number of probes sent for the current name of each service
+        probes_sent = dict.fromkeys(instance_names, 0)
+        types = list({info.type: None for info in infos})
+        next_time = now = current_time_millis()
+        # Make sure conflicting answers are cached when filtering on interest
+        self.record_manager.async_add_interest(types)
+        try:
+            while True:
+                probing = [info for info in infos if probes_sent[id(info)] < _REGISTER_BROADCASTS]
+                if not probing:
+                    break
+                # Services in the same batch must not claim the same name either
+                claimed = {info.key for info in infos if probes_sent[id(info)] == _REGISTER_BROADCASTS}
+                for info in probing:
+                    info_id = id(info)
+                    # check for a name conflict
+                    while info.key in claimed or self.cache.current_entry_with_name_and_alias(
+                        info.type, info.name
+                    ):
+                        if not allow_name_change:
+                            raise NonUniqueNameException
+
+                        # change the name and look for a conflict
+                        info.name = f'{instance_names[info_id]}-{next_instance_numbers[info_id]}.{info.type}'
+                        next_instance_numbers[info_id] += 1
+                        service_type_name(info.name)
+                        probes_sent[info_id] = 0
+                    claimed.add(info.key)
+
+                if now < next_time:
+                    await self.async_wait(next_time - now)
+                    now = current_time_millis()
+                    continue
+
+                self.async_send(self.generate_services_query(probing))
+                for info in probing:
+                    probes_sent[id(info)] += 1
+                next_time += _CHECK_TIME
+        finally:
+            self.record_manager.async_remove_interest(types)
 
     def add_listener(
         self, listener: RecordUpdateListener, question: Optional[Union[DNSQuestion, List[DNSQuestion]]]
@@ -757,6 +997,10 @@ class Zeroconf(QuietLogger):
         are held in the cache, and listeners are notified."""
         self.record_manager.async_updates_from_response(msg)
 
+    def handle_responses(self, msgs: List[DNSIncoming]) -> None:
+        """Deal with a burst of incoming response packets as a single update."""
+        self.record_manager.async_updates_from_responses(msgs)
+
     def handle_assembled_query(
         self,
         packets: List[DNSIncoming],
@@ -774,6 +1018,9 @@ class Zeroconf(QuietLogger):
         packet will be in packets.
         """
         now = packets[0].now
+        if self.query_rate_limiter and not self.query_rate_limiter.async_allow(addr, packets, now):
+            self.log_warning_once("Dropping queries from %s over the rate limit", addr)
+            return
         ucast_source = port != _MDNS_PORT
         question_answers = self.query_handler.async_response(packets, ucast_source)
         if question_answers.ucast:
@@ -785,7 +1032,7 @@ class Zeroconf(QuietLogger):
             # as we know its reachable from that socket
             self.async_send(out, addr, port, v6_flow_scope, transport)
         if question_answers.mcast_now:
-            self.async_send(construct_outgoing_multicast_answers(question_answers.mcast_now))
+            self.async_send_multicast_answers(question_answers.mcast_now)
         if question_answers.mcast_aggregate:
             self._out_queue.async_add(now, question_answers.mcast_aggregate)
         if question_answers.mcast_aggregate_last_second:
@@ -821,13 +1068,41 @@ class Zeroconf(QuietLogger):
         # If no transport is specified, we send to all the ones
         # with the same address family
         transports = [transport] if transport else self.engine.senders
+        # Remember multicast responses so the responder knows what it sent recently
+        multicast_records: List[DNSRecord] = []
+        if out.is_response() and addr in (None, _MDNS_ADDR, _MDNS_ADDR6):
+            multicast_records = [answer for answer, _ in out.answers]
+            multicast_records.extend(out.additionals)
+        now = current_time_millis()
 
-        for packet_num, packet in enumerate(out.packets()):
-            if len(packet) > _MAX_MSG_ABSOLUTE:
-                self.log_warning_once("Dropping %r over-sized packet (%d bytes) %r", out, len(packet), packet)
-                return
-            for send_transport in transports:
-                self._async_send_transport(send_transport, packet, packet_num, out, addr, port, v6_flow_scope)
+        for send_transport in transports:
+            max_size = self.engine.max_packet_sizes.get(send_transport, _MAX_MSG_TYPICAL)
+            sent = False
+            for packet_num, packet in enumerate(out.packets(max_size)):
+                if len(packet) > _MAX_MSG_ABSOLUTE:
+                    self.log_warning_once(
+                        "Dropping %r over-sized packet (%d bytes) %r", out, len(packet), packet
+                    )
+                    return
+                if self._async_send_transport(
+                    send_transport, packet, packet_num, out, addr, port, v6_flow_scope
+                ):
+                    sent = True
+            if sent and multicast_records:
+                self.multicast_history.async_add(send_transport, multicast_records, now)
+
+    def async_send_multicast_answers(self, answers: _AnswerWithAdditionalsType) -> None:
+        """Multicast answers packed into as few packets as each interface allows."""
+        if not answers:
+            return
+        transports_by_size: Dict[int, List[asyncio.DatagramTransport]] = {}
+        for transport in self.engine.senders:
+            max_size = self.engine.max_packet_sizes.get(transport, _MAX_MSG_TYPICAL)
+            transports_by_size.setdefault(max_size, []).append(transport)
+        for max_size, transports in transports_by_size.items():
+            for out in construct_outgoing_multicast_answers_packed(answers, max_size):
+                for transport in transports:
+                    self.async_send(out, transport=transport)
 
     def _async_send_transport(
         self,
@@ -838,14 +1113,15 @@ class Zeroconf(QuietLogger):
         addr: Optional[str],
         port: int,
         v6_flow_scope: Union[Tuple[()], Tuple[int, int]] = (),
-    ) -> None:
+    ) -> bool:
+        """Send a packet on a transport, returns False if it cannot send to the address."""
         s = transport.get_extra_info('socket')
         if addr is None:
             real_addr = _MDNS_ADDR6 if s.family == socket.AF_INET6 else _MDNS_ADDR
         else:
             real_addr = addr
         if not can_send_to(s, real_addr):
-            return
+            return False
         log.debug(
             'Sending to (%s, %d) via [socket %s (%s)] (%d bytes #%d) %r as %r...',
             real_addr,
@@ -863,6 +1139,7 @@ class Zeroconf(QuietLogger):
             _, _, sock_flowinfo, sock_scopeid = s.getsockname()
             v6_flow_scope = (sock_flowinfo, sock_scopeid)
         transport.sendto(packet, (real_addr, port or _MDNS_PORT, *v6_flow_scope))
+        return True
 
     def _close(self) -> None:
         """Set global done and remove all service listeners."""
@@ -22,17 +22,22 @@
 
 import enum
 import socket
-from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING, Union, cast
+import struct
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING, Tuple, Union, cast
 
 from ._exceptions import AbstractMethodException
 from ._utils.net import _is_v6_address
 from ._utils.time import current_time_millis, millis_to_seconds
 from .const import (
     _CLASSES,
+    _CLASS_IN,
     _CLASS_MASK,
     _CLASS_UNIQUE,
+    _DNS_OTHER_TTL,
     _TYPES,
     _TYPE_ANY,
+    _TYPE_NSEC,
 )
 
 _LEN_BYTE = 1
@@ -46,6 +51,8 @@ _EXPIRE_FULL_TIME_MS = 1000
 _EXPIRE_STALE_TIME_MS = 500
 _RECENT_TIME_MS = 250
 
+_PACK_SRV_RDATA = struct.Struct('!HHH').pack
+
 
 if TYPE_CHECKING:
     from ._protocol import DNSIncoming, DNSOutgoing
@@ -68,6 +75,34 @@ def dns_entry_matches(record: 'DNSEntry', key: str, type_: int, class_: int) ->
     return key == record.key and type_ == record.type and class_ == record.class_
 
 
+@lru_cache(maxsize=256)
+def _nsec_type_bitmap(rdtypes: Tuple[int, ...]) -> bytes:
+    """Encode the window 0 type bitmap of an NSEC record."""
+    bitmap = bytearray(b'\0' * 32)
+    total_octets = 0
+    for rdtype in rdtypes:
+        if rdtype > 255:  # mDNS only supports window 0
+            continue
+        offset = rdtype % 256
+        byte = offset // 8
+        total_octets = byte + 1
+        bitmap[byte] |= 0x80 >> (offset % 8)
+    return struct.pack('!HH', 0, total_octets) + bitmap[0:total_octets]
+
+
+def _name_size_compressed(name: str, known: str) -> int:
+    """Size of name in a packet where known has already been written."""
+    labels = name.split('.')
+    known_labels = known.split('.')
+    shared = 1  # Both end with the root label
+    while shared < min(len(labels), len(known_labels)) and labels[-shared - 1] == known_labels[-shared - 1]:
+        shared += 1
+    size = sum(len(label.encode('utf-8')) + _LEN_BYTE for label in labels[: len(labels) - shared])
+    if shared == 1:
+        return size + _LEN_BYTE
+    return size + _NAME_COMPRESSION_MIN_SIZE
+
+
 class DNSEntry:
 
     """A DNS entry"""
@@ -217,6 +252,11 @@ class DNSRecord(DNSEntry):
         self.created = created
         self.ttl = ttl
 
+    @property
+    def max_size_compressed(self) -> int:  # pylint: disable=no-self-use
+        """Abstract method"""
+        raise AbstractMethodException
+
     def write(self, out: 'DNSOutgoing') -> None:  # pylint: disable=no-self-use
         """Abstract method"""
         raise AbstractMethodException
@@ -249,6 +289,11 @@ class DNSAddress(DNSRecord):
         self.scope_id = scope_id
         self._hash = hash((self.key, type_, self.class_, address, scope_id))
 
+    @property
+    def max_size_compressed(self) -> int:
+        """Maximum size of the record in the packet assuming the name has been compressed."""
+        return _BASE_MAX_SIZE + _NAME_COMPRESSION_MIN_SIZE + len(self.address)
+
     def write(self, out: 'DNSOutgoing') -> None:
         """Used in constructing an outgoing packet"""
         out.write_string(self.address)
@@ -292,6 +337,18 @@ class DNSHinfo(DNSRecord):
         self.os = os
         self._hash = hash((self.key, type_, self.class_, cpu, os))
 
+    @property
+    def max_size_compressed(self) -> int:
+        """Maximum size of the record in the packet assuming the name has been compressed."""
+        return (
+            _BASE_MAX_SIZE
+            + _NAME_COMPRESSION_MIN_SIZE
+            + _LEN_BYTE
+            + len(self.cpu.encode('utf-8'))
+            + _LEN_BYTE
+            + len(self.os.encode('utf-8'))
+        )
+
     def write(self, out: 'DNSOutgoing') -> None:
         """Used in constructing an outgoing packet"""
         out.write_character_string(self.cpu.encode('utf-8'))
@@ -331,12 +388,7 @@ class DNSPointer(DNSRecord):
     @property
     def max_size_compressed(self) -> int:
         """Maximum size of the record in the packet assuming the name has been compressed."""
-        return (
-            _BASE_MAX_SIZE
-            + _NAME_COMPRESSION_MIN_SIZE
-            + (len(self.alias) - len(self.name))
-            + _NAME_COMPRESSION_MIN_SIZE
-        )
+        return _BASE_MAX_SIZE + _NAME_COMPRESSION_MIN_SIZE + _name_size_compressed(self.alias, self.name)
 
     def write(self, out: 'DNSOutgoing') -> None:
         """Used in constructing an outgoing packet"""
@@ -369,6 +421,11 @@ class DNSText(DNSRecord):
         self.text = text
         self._hash = hash((self.key, type_, self.class_, text))
 
+    @property
+    def max_size_compressed(self) -> int:
+        """Maximum size of the record in the packet assuming the name has been compressed."""
+        return _BASE_MAX_SIZE + _NAME_COMPRESSION_MIN_SIZE + len(self.text)
+
     def write(self, out: 'DNSOutgoing') -> None:
         """Used in constructing an outgoing packet"""
         out.write_string(self.text)
@@ -413,11 +470,19 @@ class DNSService(DNSRecord):
         self.server = server
         self._hash = hash((self.key, type_, self.class_, priority, weight, port, server))
 
+    @property
+    def max_size_compressed(self) -> int:
+        """Maximum size of the record in the packet assuming the name has been compressed."""
+        return (
+            _BASE_MAX_SIZE
+            + _NAME_COMPRESSION_MIN_SIZE
+            + _LEN_SHORT * 3  # priority  # weight  # port
+            + _name_size_compressed(self.server, self.name)
+        )
+
     def write(self, out: 'DNSOutgoing') -> None:
         """Used in constructing an outgoing packet"""
-        out.write_short(self.priority)
-        out.write_short(self.weight)
-        out.write_short(self.port)
+        out.write_string(_PACK_SRV_RDATA(self.priority, self.weight, self.port))
         out.write_name(self.server)
 
     def __eq__(self, other: Any) -> bool:
@@ -461,21 +526,20 @@ class DNSNsec(DNSRecord):
         self.rdtypes = sorted(rdtypes)
         self._hash = hash((self.key, type_, self.class_, next_name, *self.rdtypes))
 
+    @property
+    def max_size_compressed(self) -> int:
+        """Maximum size of the record in the packet assuming the name has been compressed."""
+        return (
+            _BASE_MAX_SIZE
+            + _NAME_COMPRESSION_MIN_SIZE
+            + _name_size_compressed(self.next_name, self.name)
+            + len(_nsec_type_bitmap(tuple(self.rdtypes)))
+        )
+
     def write(self, out: 'DNSOutgoing') -> None:
         """Used in constructing an outgoing packet."""
-        bitmap = bytearray(b'\0' * 32)
-        for rdtype in self.rdtypes:
-            if rdtype > 255:  # mDNS only supports window 0
-                continue
-            offset = rdtype % 256
-            byte = offset // 8
-            total_octets = byte + 1
-            bitmap[byte] |= 0x80 >> (offset % 8)
-        out_bytes = bytes(bitmap[0:total_octets])
         out.write_name(self.next_name)
-        out.write_short(0)
-        out.write_short(len(out_bytes))
-        out.write_string(out_bytes)
+        out.write_string(_nsec_type_bitmap(tuple(self.rdtypes)))
 
     def __eq__(self, other: Any) -> bool:
         """Tests equality on cpu and os"""
@@ -497,6 +561,15 @@ class DNSNsec(DNSRecord):
         )
 
 
+def construct_nsec_record(name: str, types: List[int], now: Optional[float] = None) -> DNSNsec:
+    """Construct an NSEC record for name and a list of dns types.
+
+    This function should only be used for SRV/A/AAAA records
+    which have a TTL of _DNS_OTHER_TTL
+    """
+    return DNSNsec(name, _TYPE_NSEC, _CLASS_IN | _CLASS_UNIQUE, _DNS_OTHER_TTL, name, types, created=now)
+
+
 class DNSRRSet:
     """A set of dns records independent of the ttl."""
 
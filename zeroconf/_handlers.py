@@ -26,21 +26,32 @@ from collections import deque
 from typing import Dict, Iterable, List, NamedTuple, Optional, Set, TYPE_CHECKING, Tuple, Union, cast
 
 from ._cache import DNSCache, _UniqueRecordsType
-from ._dns import DNSAddress, DNSNsec, DNSPointer, DNSQuestion, DNSRRSet, DNSRecord
-from ._history import QuestionHistory
+from ._dns import (
+    DNSAddress,
+    DNSPointer,
+    DNSQuestion,
+    DNSRRSet,
+    DNSRecord,
+    DNSService,
+    _NAME_COMPRESSION_MIN_SIZE,
+    _RECENT_TIME_MS,
+    _name_size_compressed,
+)
+from ._dns import construct_nsec_record  # noqa # pylint: disable=unused-import # backwards compat
+from ._history import MulticastHistory, QuestionHistory
 from ._logger import log
 from ._protocol import DNSIncoming, DNSOutgoing
-from ._services.info import ServiceInfo
 from ._services.registry import ServiceRegistry
 from ._updates import RecordUpdate, RecordUpdateListener
 from ._utils.time import current_time_millis, millis_to_seconds
 from .const import (
     _CLASS_IN,
-    _CLASS_UNIQUE,
     _DNS_OTHER_TTL,
+    _DNS_PACKET_HEADER_LEN,
     _DNS_PTR_MIN_TTL,
     _FLAGS_AA,
     _FLAGS_QR_RESPONSE,
+    _MAX_MSG_TYPICAL,
     _ONE_SECOND,
     _SERVICE_TYPE_ENUMERATION_NAME,
     _TYPE_A,
@@ -62,6 +73,9 @@ _MULTICAST_DELAY_RANDOM_INTERVAL = (20, 120)
 _ADDRESS_RECORD_TYPES = {_TYPE_A, _TYPE_AAAA}
 _RESPOND_IMMEDIATE_TYPES = {_TYPE_NSEC, _TYPE_SRV, *_ADDRESS_RECORD_TYPES}
 
+# Space reserved for the first name in a packet which cannot be compressed
+_MAX_NAME_OVERHEAD = 255
+
 
 class QuestionAnswers(NamedTuple):
     ucast: _AnswerWithAdditionalsType
@@ -82,15 +96,6 @@ def _message_is_probe(msg: DNSIncoming) -> bool:
     return msg.num_authorities > 0
 
 
-def construct_nsec_record(name: str, types: List[int], now: float) -> DNSNsec:
-    """Construct an NSEC record for name and a list of dns types.
-
-    This function should only be used for SRV/A/AAAA records
-    which have a TTL of _DNS_OTHER_TTL
-    """
-    return DNSNsec(name, _TYPE_NSEC, _CLASS_IN | _CLASS_UNIQUE, _DNS_OTHER_TTL, name, types, created=now)
-
-
 def construct_outgoing_multicast_answers(answers: _AnswerWithAdditionalsType) -> DNSOutgoing:
     """Add answers and additionals to a DNSOutgoing."""
     out = DNSOutgoing(_FLAGS_QR_RESPONSE | _FLAGS_AA, multicast=True)
@@ -98,6 +103,16 @@ def construct_outgoing_multicast_answers(answers: _AnswerWithAdditionalsType) ->
     return out
 
 
+def construct_outgoing_multicast_answers_packed(
+    answers: _AnswerWithAdditionalsType, max_size: int = _MAX_MSG_TYPICAL
+) -> List[DNSOutgoing]:
+    """Add answers and additionals to as few DNSOutgoing of max_size as possible."""
+    return [
+        construct_outgoing_multicast_answers(group)
+        for group in _pack_answers_with_additionals(answers, max_size)
+    ]
+
+
 def construct_outgoing_unicast_answers(
     answers: _AnswerWithAdditionalsType, ucast_source: bool, questions: List[DNSQuestion], id_: int
 ) -> DNSOutgoing:
@@ -125,6 +140,75 @@ def _add_answers_additionals(out: DNSOutgoing, answers: _AnswerWithAdditionalsTy
                 sending.add(additional)
 
 
+def _pack_answers_with_additionals(
+    answers: _AnswerWithAdditionalsType, max_size: int
+) -> List[_AnswerWithAdditionalsType]:
+    """Bin-pack answers into as few packets as possible.
+
+    Each answer is kept in the same packet as its additionals so a
+    packet can be processed on its own. Sizes are estimated with
+    name compression the same way known answers are bucketed for
+    queries; if an estimate is short the packet is still split when
+    the DNSOutgoing is written.
+    """
+    if not answers:
+        return []
+    max_bucket_size = max_size - _DNS_PACKET_HEADER_LEN
+    # Additionals that are already answers are never sent twice
+    groups: _AnswerWithAdditionalsType = {
+        answer: additionals.difference(answers) for answer, additionals in answers.items()
+    }
+    record_sizes: Dict[DNSRecord, int] = {}
+    for answer, additionals in groups.items():
+        record_sizes[answer] = answer.max_size_compressed
+        for additional in additionals:
+            if additional not in record_sizes:
+                record_sizes[additional] = additional.max_size_compressed
+    if sum(record_sizes.values()) <= max_bucket_size - _MAX_NAME_OVERHEAD:
+        return [answers]
+
+    group_by_size: Dict[DNSRecord, int] = {
+        answer: record_sizes[answer] + sum(record_sizes[additional] for additional in additionals)
+        for answer, additionals in groups.items()
+    }
+    buckets: List[_AnswerWithAdditionalsType] = []
+    bucket_bytes: List[int] = []
+    bucket_records: List[Set[DNSRecord]] = []
+    for answer in sorted(group_by_size, key=group_by_size.__getitem__, reverse=True):
+        additionals = groups[answer]
+        for idx, records in enumerate(bucket_records):
+            size = group_by_size[answer]
+            if bucket_bytes[idx] + size <= max_bucket_size:
+                break
+            if bucket_bytes[idx] + record_sizes[answer] > max_bucket_size:
+                continue
+            # Additionals already in the packet, such as a shared address, are free
+            size -= sum(record_sizes[additional] for additional in additionals if additional in records)
+            if bucket_bytes[idx] + size <= max_bucket_size:
+                break
+        else:
+            # The first name in a packet cannot be compressed. If a single
+            # group won't fit in a packet it will end up in multiple packets.
+            idx = len(buckets)
+            buckets.append({})
+            bucket_bytes.append(_name_size_compressed(answer.name, "") - _NAME_COMPRESSION_MIN_SIZE)
+            bucket_records.append(set())
+            size = group_by_size[answer]
+        buckets[idx][answer] = additionals
+        bucket_bytes[idx] += size
+        bucket_records[idx].add(answer)
+        bucket_records[idx].update(additionals)
+    return buckets
+
+
+def _add_referenced_name(record: DNSRecord, referenced: Set[str]) -> None:
+    """Add the name a PTR or SRV record points to."""
+    if isinstance(record, DNSPointer):
+        referenced.add(record.alias.lower())
+    elif isinstance(record, DNSService):
+        referenced.add(record.server.lower())
+
+
 def sanitize_incoming_record(record: DNSRecord) -> None:
     """Protect zeroconf from records that can cause denial of service.
 
@@ -145,12 +229,15 @@ def sanitize_incoming_record(record: DNSRecord) -> None:
 class _QueryResponse:
     """A pair for unicast and multicast DNSOutgoing responses."""
 
-    def __init__(self, cache: DNSCache, msgs: List[DNSIncoming]) -> None:
+    def __init__(
+        self, cache: DNSCache, msgs: List[DNSIncoming], multicast_history: Optional[MulticastHistory] = None
+    ) -> None:
         """Build a query response."""
         self._is_probe = any(_message_is_probe(msg) for msg in msgs)
         self._msg = msgs[0]
         self._now = self._msg.now
         self._cache = cache
+        self._multicast_history = MulticastHistory() if multicast_history is None else multicast_history
         self._additionals: _AnswerWithAdditionalsType = {}
         self._ucast: Set[DNSRecord] = set()
         self._mcast_now: Set[DNSRecord] = set()
@@ -213,7 +300,14 @@ class _QueryResponse:
         record recently (within one quarter of its TTL), then the responder
         SHOULD instead multicast the response so as to keep all the peer
         caches up to date
+
+        The record may also have been multicast by another responder
+        or we may have missed sending it, so the cache is checked
+        when the multicast history does not have it.
         """
+        last_multicast = self._multicast_history.last_multicast(record)
+        if last_multicast is not None and self._now - last_multicast < _RECENT_TIME_MS * record.ttl:
+            return True
         maybe_entry = self._cache.async_get_unique(cast(_UniqueRecordsType, record))
         return bool(maybe_entry and maybe_entry.is_recent(self._now))
 
@@ -222,6 +316,9 @@ class _QueryResponse:
         Protect the network against excessive packet flooding
         https://datatracker.ietf.org/doc/html/rfc6762#section-14
         """
+        last_multicast = self._multicast_history.last_multicast(record)
+        if last_multicast is not None and self._now - last_multicast < _ONE_SECOND:
+            return True
         maybe_entry = self._cache.async_get_unique(cast(_UniqueRecordsType, record))
         return bool(maybe_entry and self._now - maybe_entry.created < _ONE_SECOND)
 
@@ -229,11 +326,18 @@ class _QueryResponse:
 class QueryHandler:
     """Query the ServiceRegistry."""
 
-    def __init__(self, registry: ServiceRegistry, cache: DNSCache, question_history: QuestionHistory) -> None:
+    def __init__(
+        self,
+        registry: ServiceRegistry,
+        cache: DNSCache,
+        question_history: QuestionHistory,
+        multicast_history: Optional[MulticastHistory] = None,
+    ) -> None:
         """Init the query handler."""
         self.registry = registry
         self.cache = cache
         self.question_history = question_history
+        self.multicast_history = MulticastHistory() if multicast_history is None else multicast_history
 
     def _add_service_type_enumeration_query_answers(
         self, answer_set: _AnswerWithAdditionalsType, known_answers: DNSRRSet, now: float
@@ -250,58 +354,38 @@ class QueryHandler:
                 answer_set[dns_pointer] = set()
 
     def _add_pointer_answers(
-        self, name: str, answer_set: _AnswerWithAdditionalsType, known_answers: DNSRRSet, now: float
+        self, name: str, answer_set: _AnswerWithAdditionalsType, known_answers: DNSRRSet
     ) -> None:
         """Answer PTR/ANY question."""
-        for service in self.registry.async_get_infos_type(name):
+        for records in self.registry.async_get_records_type(name):
             # Add recommended additional answers according to
             # https://tools.ietf.org/html/rfc6763#section-12.1.
-            dns_pointer = service.dns_pointer(created=now)
-            if known_answers.suppresses(dns_pointer):
-                continue
-            additionals: Set[DNSRecord] = {service.dns_service(created=now), service.dns_text(created=now)}
-            additionals |= self._get_address_and_nsec_records(service, now)
-            answer_set[dns_pointer] = additionals
-
-    def _get_address_and_nsec_records(self, service: ServiceInfo, now: float) -> Set[DNSRecord]:
-        """Build a set of address records and NSEC records for non-present record types."""
-        seen_types: Set[int] = set()
-        records: Set[DNSRecord] = set()
-        for dns_address in service.dns_addresses(created=now):
-            seen_types.add(dns_address.type)
-            records.add(dns_address)
-        missing_types: Set[int] = _ADDRESS_RECORD_TYPES - seen_types
-        if missing_types:
-            records.add(construct_nsec_record(service.server, list(missing_types), now))
-        return records
+            if not known_answers.suppresses(records.pointer):
+                answer_set[records.pointer] = records.pointer_additionals
 
     def _add_address_answers(
         self,
         name: str,
         answer_set: _AnswerWithAdditionalsType,
         known_answers: DNSRRSet,
-        now: float,
         type_: int,
     ) -> None:
         """Answer A/AAAA/ANY question."""
-        for service in self.registry.async_get_infos_server(name):
+        for records in self.registry.async_get_records_server(name):
             answers: List[DNSAddress] = []
             additionals: Set[DNSRecord] = set()
-            seen_types: Set[int] = set()
-            for dns_address in service.dns_addresses(created=now):
-                seen_types.add(dns_address.type)
+            for dns_address in records.addresses:
                 if dns_address.type != type_:
                     additionals.add(dns_address)
                 elif not known_answers.suppresses(dns_address):
                     answers.append(dns_address)
-            missing_types: Set[int] = _ADDRESS_RECORD_TYPES - seen_types
             if answers:
-                if missing_types:
-                    additionals.add(construct_nsec_record(service.server, list(missing_types), now))
+                if records.nsec:
+                    additionals.add(records.nsec)
                 for answer in answers:
                     answer_set[answer] = additionals
-            elif type_ in missing_types:
-                answer_set[construct_nsec_record(service.server, list(missing_types), now)] = set()
+            elif records.nsec and type_ in records.nsec.rdtypes:
+                answer_set[records.nsec] = set()
 
     def _answer_question(
         self,
@@ -315,27 +399,28 @@ class QueryHandler:
             self._add_service_type_enumeration_query_answers(answer_set, known_answers, now)
             return answer_set
 
+        if not self.registry.async_has_name(question.name):
+            return answer_set
+
         type_ = question.type
 
         if type_ in (_TYPE_PTR, _TYPE_ANY):
-            self._add_pointer_answers(question.name, answer_set, known_answers, now)
+            self._add_pointer_answers(question.name, answer_set, known_answers)
 
         if type_ in (_TYPE_A, _TYPE_AAAA, _TYPE_ANY):
-            self._add_address_answers(question.name, answer_set, known_answers, now, type_)
+            self._add_address_answers(question.name, answer_set, known_answers, type_)
 
         if type_ in (_TYPE_SRV, _TYPE_TXT, _TYPE_ANY):
-            service = self.registry.async_get_info_name(question.name)  # type: ignore
-            if service is not None:
+            records = self.registry.async_get_records_name(question.name)
+            if records is not None:
                 if type_ in (_TYPE_SRV, _TYPE_ANY):
                     # Add recommended additional answers according to
                     # https://tools.ietf.org/html/rfc6763#section-12.2.
-                    dns_service = service.dns_service(created=now)
-                    if not known_answers.suppresses(dns_service):
-                        answer_set[dns_service] = self._get_address_and_nsec_records(service, now)
+                    if not known_answers.suppresses(records.service):
+                        answer_set[records.service] = records.service_additionals
                 if type_ in (_TYPE_TXT, _TYPE_ANY):
-                    dns_text = service.dns_text(created=now)
-                    if not known_answers.suppresses(dns_text):
-                        answer_set[dns_text] = set()
+                    if not known_answers.suppresses(records.text):
+                        answer_set[records.text] = set()
 
         return answer_set
 
@@ -350,7 +435,7 @@ class QueryHandler:
         known_answers = DNSRRSet(
             itertools.chain(*(msg.answers for msg in msgs if not _message_is_probe(msg)))
         )
-        query_res = _QueryResponse(self.cache, msgs)
+        query_res = _QueryResponse(self.cache, msgs, self.multicast_history)
 
         for msg in msgs:
             for question in msg.questions:
@@ -372,11 +457,102 @@ class QueryHandler:
 class RecordManager:
     """Process records into the cache and notify listeners."""
 
-    def __init__(self, zeroconf: 'Zeroconf') -> None:
-        """Init the record manager."""
+    def __init__(self, zeroconf: 'Zeroconf', interest_filter: bool = False) -> None:
+        """Init the record manager.
+
+        When interest_filter is True, only records that a listener, a browser,
+        a pending probe or a registered service is interested in are cached
+        and passed to listeners. Listeners added without a question do not
+        express any interest.
+        """
         self.zc = zeroconf
         self.cache = zeroconf.cache
         self.listeners: List[RecordUpdateListener] = []
+        self.interest_filter = interest_filter
+        self._interests: Dict[str, int] = {}
+        self._listener_interests: Dict[int, List[str]] = {}
+
+    def async_add_interest(self, names: Iterable[str]) -> None:
+        """Express interest in records for names and any name under them.
+
+        This function is not threadsafe and must be called in the eventloop.
+        """
+        for name in names:
+            key = name.lower()
+            self._interests[key] = self._interests.get(key, 0) + 1
+
+    def async_remove_interest(self, names: Iterable[str]) -> None:
+        """Remove interest previously added with async_add_interest.
+
+        This function is not threadsafe and must be called in the eventloop.
+        """
+        for name in names:
+            key = name.lower()
+            count = self._interests.get(key, 0) - 1
+            if count > 0:
+                self._interests[key] = count
+            else:
+                self._interests.pop(key, None)
+
+    def async_has_interest(self, key: str) -> bool:
+        """Check if the key or a name it falls under is of interest.
+
+        This function must be run in from event loop.
+        """
+        if self.zc.registry.async_has_name(key):
+            return True
+        interests = self._interests
+        if key in interests:
+            return True
+        dot = key.find('.')
+        while dot != -1:
+            if key[dot + 1 :] in interests:
+                return True
+            dot = key.find('.', dot + 1)
+        return False
+
+    def _async_record_is_interesting(self, record: DNSRecord) -> bool:
+        """Check if a cached record is of interest or is the address of a cached service."""
+        key = record.key
+        return self.async_has_interest(key) or bool(self.cache.async_entries_with_server(key))
+
+    def _async_filter_interesting(self, answers: List[DNSRecord]) -> List[DNSRecord]:
+        """Filter the records of a response to the ones we are interested in.
+
+        A record is interesting if its name is of interest, if we already
+        have records for its name in the cache, or if it is referenced by
+        another interesting record (PTR alias or SRV server) in the response.
+        """
+        cache = self.cache
+        interesting: List[DNSRecord] = []
+        pending: List[DNSRecord] = []
+        referenced: Set[str] = set()
+        for record in answers:
+            key = record.key
+            if (
+                self.async_has_interest(key)
+                or cache.async_entries_with_name(key)
+                or cache.async_entries_with_server(key)
+            ):
+                interesting.append(record)
+                _add_referenced_name(record, referenced)
+            else:
+                pending.append(record)
+
+        # Records can reference names that reference other names
+        # (PTR -> SRV -> A/AAAA) so keep going until nothing changes
+        while pending and referenced:
+            found = [record for record in pending if record.key in referenced]
+            if not found:
+                break
+            pending = [record for record in pending if record.key not in referenced]
+            for record in found:
+                interesting.append(record)
+                _add_referenced_name(record, referenced)
+
+        if pending:
+            log.debug("Ignoring %d records without interest", len(pending))
+        return interesting
 
     def async_updates(self, now: float, records: List[RecordUpdate]) -> None:
         """Used to notify listeners of new information that has updated
@@ -405,6 +581,47 @@ class RecordManager:
         """Deal with incoming response packets.  All answers
         are held in the cache, and listeners are notified.
 
+        This function must be run in the event loop as it is not
+        threadsafe.
+        """
+        self.async_updates_from_responses([msg])
+
+    def _async_evict(self, now: float) -> bool:
+        """Evict records if the cache is over its limit and tell listeners about them.
+
+        Evicted records are reported the same way as expired ones.
+        """
+        evicted = self.cache.async_evict(self._async_record_is_interesting)
+        if not evicted:
+            return False
+        self.async_updates(now, [RecordUpdate(record, None) for record in evicted])
+        return True
+
+    def _async_answers_from_responses(self, msgs: List[DNSIncoming]) -> List[DNSRecord]:
+        """Merge the answers of a burst of responses and filter them to the interesting ones.
+
+        When the same record appears in more than one packet, the last one received wins.
+        """
+        if len(msgs) == 1:
+            answers = msgs[0].answers
+        else:
+            merged: Dict[DNSRecord, DNSRecord] = {}
+            for msg in msgs:
+                for record in msg.answers:
+                    merged.pop(record, None)
+                    merged[record] = record
+            answers = list(merged)
+        if self.interest_filter:
+            return self._async_filter_interesting(answers)
+        return answers
+
+    def async_updates_from_responses(self, msgs: List[DNSIncoming]) -> None:
+        """Deal with a burst of incoming response packets as a single update.
+
+        The answers of all the packets are merged so listeners are
+        only notified once for the whole burst. When the same record
+        appears in more than one packet, the last one received wins.
+
         This function must be run in the event loop as it is not
         threadsafe.
         """
@@ -412,10 +629,11 @@ class RecordManager:
         address_adds: List[DNSAddress] = []
         other_adds: List[DNSRecord] = []
         removes: Set[DNSRecord] = set()
-        now = msg.now
+        now = msgs[-1].now
         unique_types: Set[Tuple[str, int, int]] = set()
+        answers = self._async_answers_from_responses(msgs)
 
-        for record in msg.answers:
+        for record in answers:
             sanitize_incoming_record(record)
 
             if record.unique:  # https://tools.ietf.org/html/rfc6762#section-10.2
@@ -424,7 +642,7 @@ class RecordManager:
             maybe_entry = self.cache.async_get_unique(cast(_UniqueRecordsType, record))
             if not record.is_expired(now):
                 if maybe_entry is not None:
-                    maybe_entry.reset_ttl(record)
+                    self.cache.async_reset_ttl(maybe_entry, record)
                 else:
                     if isinstance(record, DNSAddress):
                         address_adds.append(record)
@@ -438,7 +656,7 @@ class RecordManager:
                 removes.add(record)
 
         if unique_types:
-            self._async_mark_unique_cached_records_older_than_1s_to_expire(unique_types, msg.answers, now)
+            self._async_mark_unique_cached_records_older_than_1s_to_expire(unique_types, answers, now)
 
         if updates:
             self.async_updates(now, updates)
@@ -457,14 +675,16 @@ class RecordManager:
         # zc.get_service_info will see the cached value
         # but ONLY after all the record updates have been
         # processsed.
+        evicted = False
         if other_adds or address_adds:
             self.cache.async_add_records(itertools.chain(address_adds, other_adds))
+            evicted = self._async_evict(now)
         # Removes are processed last since
         # ServiceInfo could generate an un-needed query
         # because the data was not yet populated.
         if removes:
             self.cache.async_remove_records(removes)
-        if updates:
+        if updates or evicted:
             self.async_updates_complete()
 
     def _async_mark_unique_cached_records_older_than_1s_to_expire(
@@ -479,7 +699,7 @@ class RecordManager:
             for entry in self.cache.async_all_by_details(name, type_, class_):
                 if (now - entry.created > _ONE_SECOND) and entry not in answers_rrset:
                     # Expire in 1s
-                    entry.set_created_ttl(now, 1)
+                    self.cache.async_set_created_ttl(entry, now, 1)
 
     def async_add_listener(
         self, listener: RecordUpdateListener, question: Optional[Union[DNSQuestion, List[DNSQuestion]]]
@@ -496,6 +716,9 @@ class RecordManager:
             return
 
         questions = [question] if isinstance(question, DNSQuestion) else question
+        names = [question.name for question in questions]
+        self._listener_interests.setdefault(id(listener), []).extend(names)
+        self.async_add_interest(names)
         assert self.zc.loop is not None
         self._async_update_matching_records(listener, questions)
 
@@ -526,6 +749,7 @@ class RecordManager:
         """
         try:
             self.listeners.remove(listener)
+            self.async_remove_interest(self._listener_interests.pop(id(listener), []))
             self.zc.async_notify_all()
         except ValueError as e:
             log.exception('Failed to remove listener: %r', e)
@@ -537,15 +761,37 @@ class MulticastOutgoingQueue:
     def __init__(self, zeroconf: 'Zeroconf', additional_delay: int, max_aggregation_delay: int) -> None:
         self.zc = zeroconf
         self.queue: deque = deque()
+        # The group each answer in the queue is scheduled to go out with
+        self._pending: Dict[DNSRecord, AnswerGroup] = {}
         # Additional delay is used to implement
         # Protect the network against excessive packet flooding
         # https://datatracker.ietf.org/doc/html/rfc6762#section-14
         self.additional_delay = additional_delay
         self.aggregation_delay = max_aggregation_delay
+        # Answers merged into a group that was already scheduled
+        self.aggregated = 0
+        # Answers dropped because they were already scheduled
+        self.suppressed = 0
 
     def async_add(self, now: float, answers: _AnswerWithAdditionalsType) -> None:
         """Add a group of answers with additionals to the outgoing queue."""
         assert self.zc.loop is not None
+        pending = self._pending
+        new_answers: _AnswerWithAdditionalsType = {}
+        for record, additionals in answers.items():
+            group = pending.get(record)
+            if group is None:
+                new_answers[record] = additionals
+                continue
+            # Groups are sent in the order they were added so the answer
+            # will go out no later than it would in a new group
+            self.suppressed += 1
+            queued_additionals = group.answers[record]
+            if not additionals <= queued_additionals:
+                group.answers[record] = queued_additionals | additionals
+        if not new_answers:
+            return
+
         random_delay = random.randint(*_MULTICAST_DELAY_RANDOM_INTERVAL) + self.additional_delay
         send_after = now + random_delay
         send_before = now + self.aggregation_delay + self.additional_delay
@@ -556,17 +802,15 @@ class MulticastOutgoingQueue:
             # allows aggregating additonal responses
             last_group = self.queue[-1]
             if send_after <= last_group.send_after:
-                last_group.answers.update(answers)
+                last_group.answers.update(new_answers)
+                pending.update(dict.fromkeys(new_answers, last_group))
+                self.aggregated += len(new_answers)
                 return
         else:
             self.zc.loop.call_later(millis_to_seconds(random_delay), self.async_ready)
-        self.queue.append(AnswerGroup(send_after, send_before, answers))
-
-    def _remove_answers_from_queue(self, answers: _AnswerWithAdditionalsType) -> None:
-        """Remove a set of answers from the outgoing queue."""
-        for pending in self.queue:
-            for record in answers:
-                pending.answers.pop(record, None)
+        group = AnswerGroup(send_after, send_before, new_answers)
+        self.queue.append(group)
+        pending.update(dict.fromkeys(new_answers, group))
 
     def async_ready(self) -> None:
         """Process anything in the queue that is ready."""
@@ -590,6 +834,7 @@ class MulticastOutgoingQueue:
             self.zc.loop.call_later(millis_to_seconds(self.queue[0].send_after - now), self.async_ready)
 
         if answers:
-            # If we have the same answer scheduled to go out, remove them
-            self._remove_answers_from_queue(answers)
-            self.zc.async_send(construct_outgoing_multicast_answers(answers))
+            pending = self._pending
+            for record in answers:
+                del pending[record]
+            self.zc.async_send_multicast_answers(answers)
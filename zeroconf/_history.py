@@ -20,10 +20,15 @@
     USA
 """
 
-from typing import Dict, Set, Tuple
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
 
-from ._dns import DNSQuestion, DNSRecord
-from .const import _DUPLICATE_QUESTION_INTERVAL
+from ._dns import DNSQuestion, DNSRecord, _RECENT_TIME_MS
+from .const import _DUPLICATE_PACKET_SUPPRESSION_INTERVAL, _DUPLICATE_QUESTION_INTERVAL, _ONE_SECOND
+
+# The maximum number of distinct packets remembered
+# for duplicate packet suppression
+_MAX_PACKET_HISTORY = 1024
 
 # The QuestionHistory is used to implement Duplicate Question Suppression
 # https://datatracker.ietf.org/doc/html/rfc6762#section-7.3
@@ -68,3 +73,105 @@ class QuestionHistory:
         ]
         for question in removes:
             del self._history[question]
+
+
+class PacketHistory:
+    """Remember recently received packets to suppress duplicates.
+
+    The same multicast packet is often delivered on more than one socket
+    (once per interface or address family) and may be interleaved with
+    other traffic, so a single history is shared by all the listeners of
+    a Zeroconf instance. Packets are keyed by a hash of the payload and
+    the address they came from, so identical queries from different hosts
+    are all answered. The address includes the IPv6 scope id since it
+    ends up in the decoded address records.
+    """
+
+    def __init__(
+        self,
+        interval: float = _DUPLICATE_PACKET_SUPPRESSION_INTERVAL,
+        max_packets: int = _MAX_PACKET_HISTORY,
+    ) -> None:
+        self._history: 'OrderedDict[Tuple[int, Hashable], float]' = OrderedDict()
+        self._interval = interval
+        self._max_packets = max_packets
+        self.hits = 0
+        self.misses = 0
+
+    def suppresses(self, data: bytes, source: Hashable, now: float) -> bool:
+        """Check to see if a packet was already received from source within the interval.
+
+        Packets that are not suppressed are remembered.
+        """
+        key = (hash(data), source)
+        seen = self._history.get(key)
+        if seen is not None and now - seen < self._interval:
+            self.hits += 1
+            return True
+        self.misses += 1
+        self._history[key] = now
+        self._history.move_to_end(key)
+        self.async_expire(now)
+        return False
+
+    def async_expire(self, now: float) -> None:
+        """Expire packets that are older than the interval or over the limit."""
+        history = self._history
+        while history:
+            oldest = next(iter(history.values()))
+            if now - oldest < self._interval and len(history) <= self._max_packets:
+                return
+            history.popitem(last=False)
+
+
+class MulticastHistory:
+    """Remember when records were last multicast on each interface.
+
+    The responder uses this to implement
+    https://datatracker.ietf.org/doc/html/rfc6762#section-5.4 and
+    https://datatracker.ietf.org/doc/html/rfc6762#section-14
+    without depending on hearing its own packets back. Records are
+    only kept for as long as either check can use them.
+    """
+
+    def __init__(self) -> None:
+        self._interfaces: Dict[Hashable, Dict[DNSRecord, float]] = {}
+
+    def async_add_interface(self, interface: Hashable) -> None:
+        """Add an interface that multicast responses are sent on."""
+        self._interfaces.setdefault(interface, {})
+
+    def async_add(self, interface: Hashable, records: Iterable[DNSRecord], now: float) -> None:
+        """Remember records that were multicast on an interface."""
+        history = self._interfaces.setdefault(interface, {})
+        for record in records:
+            # Replace the key as well so the TTL used for expiry is current
+            history.pop(record, None)
+            if record.ttl:
+                history[record] = now
+
+    def last_multicast(self, record: DNSRecord) -> Optional[float]:
+        """Return when a record was last multicast on every interface.
+
+        A response is multicast on all interfaces, so a record only
+        counts as sent once it went out on each of them.
+        """
+        last: Optional[float] = None
+        for history in self._interfaces.values():
+            when = history.get(record)
+            if when is None:
+                return None
+            if last is None or when < last:
+                last = when
+        return last
+
+    def async_expire(self, now: float) -> None:
+        """Expire records that are older than one quarter of their TTL."""
+        for history in self._interfaces.values():
+            removes = [
+                record
+                for record, when in history.items()
+                if now - when > max(record.ttl * _RECENT_TIME_MS, _ONE_SECOND)
+            ]
+            for record in removes:
+                del history[record]
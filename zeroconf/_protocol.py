@@ -22,13 +22,12 @@
 
 import enum
 import struct
-from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING, Tuple, Union, cast
+from typing import Dict, List, Optional, Set, TYPE_CHECKING, Tuple, Union, cast
 
 
 from ._dns import DNSAddress, DNSHinfo, DNSNsec, DNSPointer, DNSQuestion, DNSRecord, DNSService, DNSText
 from ._exceptions import IncomingDecodeError, NamePartTooLongException
 from ._logger import QuietLogger, log
-from ._utils.struct import int2byte
 from ._utils.time import current_time_millis
 from .const import (
     _CLASS_UNIQUE,
@@ -54,12 +53,79 @@ DNS_COMPRESSION_HEADER_LEN = 1
 DNS_COMPRESSION_POINTER_LEN = 2
 MAX_DNS_LABELS = 128
 MAX_NAME_LENGTH = 253
+# Labels and names are shared across packets since the same
+# service types, domains and host names are seen over and over
+# again. The tables are cleared once they fill up to bound memory.
+MAX_INTERNED_LABELS = 4096
+MAX_INTERNED_NAMES = 4096
+# The encoded labels of names we write are kept since the
+# same names are answered over and over again
+MAX_CACHED_NAME_ENCODINGS = 4096
 
 DECODE_EXCEPTIONS = (IndexError, struct.error, IncomingDecodeError)
 
 if TYPE_CHECKING:
     from ._cache import DNSCache
 
+_interned_labels: Dict[bytes, str] = {}
+_interned_names: Dict[str, str] = {}
+# suffixes, length prefixed labels and the offset of each label in
+# the labels followed by the total length of the labels
+_EncodedNameType = Tuple[List[str], bytes, List[int]]
+_name_encodings: Dict[str, _EncodedNameType] = {}
+
+_PACK_SHORT = struct.Struct('!H').pack
+_PACK_SHORT_INTO = struct.Struct('!H').pack_into
+_PACK_INT = struct.Struct('!I').pack
+_PACK_HEADER_INTO = struct.Struct('!6H').pack_into
+# type, class, ttl and a placeholder for the rdlength
+_PACK_RECORD_HEADER = struct.Struct('!HHIH').pack
+
+
+def _intern_label(raw_label: bytes) -> str:
+    """Decode a raw label and remember it for the next packets."""
+    if len(_interned_labels) >= MAX_INTERNED_LABELS:
+        _interned_labels.clear()
+    label = _interned_labels[raw_label] = str(raw_label, 'utf-8', 'replace')
+    return label
+
+
+def _intern_name(name: str) -> str:
+    """Return the shared copy of a decoded name."""
+    interned = _interned_names.get(name)
+    if interned is not None:
+        return interned
+    if len(_interned_names) >= MAX_INTERNED_NAMES:
+        _interned_names.clear()
+    _interned_names[name] = name
+    return name
+
+
+def _encode_name(name: str) -> _EncodedNameType:
+    """Split a name into its suffixes and encoded labels."""
+    encoded = _name_encodings.get(name)
+    if encoded is not None:
+        return encoded
+    parts = name.split('.')
+    if not parts[-1]:
+        parts.pop()
+    suffixes = ['.'.join(parts[i:]) for i in range(len(parts))]
+    labels = bytearray()
+    offsets = []
+    for part in parts:
+        utfstr = part.encode('utf-8')
+        length = len(utfstr)
+        if length > 64:
+            raise NamePartTooLongException
+        offsets.append(len(labels))
+        labels.append(length)
+        labels += utfstr
+    offsets.append(len(labels))
+    if len(_name_encodings) >= MAX_CACHED_NAME_ENCODINGS:
+        _name_encodings.clear()
+    encoded = _name_encodings[name] = (suffixes, bytes(labels), offsets)
+    return encoded
+
 
 class DNSMessage:
     """A base class for DNS messages."""
@@ -86,8 +152,16 @@ class DNSIncoming(DNSMessage, QuietLogger):
 
     """Object representation of an incoming DNS packet"""
 
-    def __init__(self, data: bytes, scope_id: Optional[int] = None, now: Optional[float] = None) -> None:
-        """Constructor from string holding bytes of packet"""
+    def __init__(
+        self, data: bytes, scope_id: Optional[int] = None, now: Optional[float] = None, *, lazy: bool = False
+    ) -> None:
+        """Constructor from string holding bytes of packet
+
+        When lazy is True only the header and the questions are decoded
+        up front and the records are decoded the first time answers is
+        accessed. In that case valid only reflects the header and the
+        questions until the records have been decoded.
+        """
         super().__init__(0)
         self.offset = 0
         self.data = data
@@ -95,7 +169,8 @@ class DNSIncoming(DNSMessage, QuietLogger):
         self.name_cache: Dict[int, List[str]] = {}
         self.seen_pointers: Set[int] = set()
         self.questions: List[DNSQuestion] = []
-        self.answers: List[DNSRecord] = []
+        self._answers: List[DNSRecord] = []
+        self._did_read_others = False
         self.id = 0
         self.num_questions = 0
         self.num_answers = 0
@@ -108,11 +183,31 @@ class DNSIncoming(DNSMessage, QuietLogger):
         try:
             self.read_header()
             self.read_questions()
-            self.read_others()
+            if not lazy:
+                self.read_others()
             self.valid = True
         except DECODE_EXCEPTIONS:
+            self._did_read_others = True
             self.log_exception_warning('Choked at offset %d while unpacking %r', self.offset, data)
 
+    @property
+    def answers(self) -> List[DNSRecord]:
+        """Returns the answers, authorities and additionals in the packet.
+
+        If the packet was created lazily, the records are decoded on first access.
+        A packet whose records cannot be decoded is marked as not valid and is
+        treated as if it had no records, the same way the eager decoder
+        causes the whole packet to be discarded.
+        """
+        if not self._did_read_others:
+            try:
+                self.read_others()
+            except DECODE_EXCEPTIONS:
+                self.valid = False
+                self._answers.clear()
+                self.log_exception_warning('Choked at offset %d while unpacking %r', self.offset, self.data)
+        return self._answers
+
     def __repr__(self) -> str:
         return '<DNSIncoming:{%s}>' % ', '.join(
             [
@@ -129,9 +224,8 @@ class DNSIncoming(DNSMessage, QuietLogger):
         )
 
     def unpack(self, format_: bytes) -> tuple:
-        length = struct.calcsize(format_)
-        info = struct.unpack(format_, self.data[self.offset : self.offset + length])
-        self.offset += length
+        info = struct.unpack_from(format_, self.data, self.offset)
+        self.offset += struct.calcsize(format_)
         return info
 
     def read_header(self) -> None:
@@ -173,6 +267,7 @@ class DNSIncoming(DNSMessage, QuietLogger):
     def read_others(self) -> None:
         """Reads the answers, authorities and additionals section of the
         packet"""
+        self._did_read_others = True
         n = self.num_answers + self.num_authorities + self.num_additionals
         for _ in range(n):
             domain = self.read_name()
@@ -195,7 +290,7 @@ class DNSIncoming(DNSMessage, QuietLogger):
                     exc_info=True,
                 )
             if rec is not None:
-                self.answers.append(rec)
+                self._answers.append(rec)
 
     def read_record(self, domain: str, type_: int, class_: int, ttl: int, length: int) -> Optional[DNSRecord]:
         """Read known records types and skip unknown ones."""
@@ -270,7 +365,7 @@ class DNSIncoming(DNSMessage, QuietLogger):
         name = ".".join(labels)
         if len(name) > MAX_NAME_LENGTH:
             raise IncomingDecodeError(f"DNS name {name} exceeds maximum length of {MAX_NAME_LENGTH}")
-        return name
+        return _intern_name(name)
 
     def _decode_labels_at_offset(self, off: int, labels: List[str]) -> int:
         # This is a tight loop that is called frequently, small optimizations can make a difference.
@@ -281,7 +376,11 @@ class DNSIncoming(DNSMessage, QuietLogger):
 
             if length < 0x40:
                 label_idx = off + DNS_COMPRESSION_HEADER_LEN
-                labels.append(str(self.data[label_idx : label_idx + length], 'utf-8', 'replace'))
+                raw_label = self.data[label_idx : label_idx + length]
+                label = _interned_labels.get(raw_label)
+                if label is None:
+                    label = _intern_label(raw_label)
+                labels.append(label)
                 off += DNS_COMPRESSION_HEADER_LEN + length
                 continue
 
@@ -318,13 +417,18 @@ class DNSOutgoing(DNSMessage):
         self.finished = False
         self.id = id_
         self.multicast = multicast
-        self.packets_data: List[bytes] = []
+        self.packets_data: Dict[int, List[bytes]] = {}
 
-        # these 3 are per-packet -- see also _reset_for_next_packet()
+        # these are per-packet -- see also _reset_for_next_packet()
         self.names: Dict[str, int] = {}
-        self.data: List[bytes] = []
-        self.size: int = _DNS_PACKET_HEADER_LEN
+        # The names in the order they were added so a rollback
+        # only has to look at the names it removes
+        self._names_added: List[str] = []
+        # The header is written into the reserved space at the
+        # start once we know how many records fit in the packet
+        self.data = bytearray(_DNS_PACKET_HEADER_LEN)
         self.allow_long: bool = True
+        self.max_size = _MAX_MSG_TYPICAL
 
         self.state = self.State.init
 
@@ -335,10 +439,15 @@ class DNSOutgoing(DNSMessage):
 
     def _reset_for_next_packet(self) -> None:
         self.names = {}
-        self.data = []
-        self.size = _DNS_PACKET_HEADER_LEN
+        self._names_added = []
+        self.data = bytearray(_DNS_PACKET_HEADER_LEN)
         self.allow_long = True
 
+    @property
+    def size(self) -> int:
+        """The size of the packet being written."""
+        return len(self.data)
+
     def __repr__(self) -> str:
         return '<DNSOutgoing:{%s}>' % ', '.join(
             [
@@ -434,52 +543,26 @@ class DNSOutgoing(DNSMessage):
         for cached_entry in cached_entries:
             self.add_answer_at_time(cached_entry, now)
 
-    def _pack(self, format_: Union[bytes, str], value: Any) -> None:
-        self.data.append(struct.pack(format_, value))
-        self.size += struct.calcsize(format_)
-
-    def _write_byte(self, value: int) -> None:
-        """Writes a single byte to the packet"""
-        self._pack(b'!c', int2byte(value))
-
-    def _insert_short_at_start(self, value: int) -> None:
-        """Inserts an unsigned short at the start of the packet"""
-        self.data.insert(0, struct.pack(b'!H', value))
-
-    def _replace_short(self, index: int, value: int) -> None:
-        """Replaces an unsigned short in a certain position in the packet"""
-        self.data[index] = struct.pack(b'!H', value)
-
     def write_short(self, value: int) -> None:
         """Writes an unsigned short to the packet"""
-        self._pack(b'!H', value)
+        self.data += _PACK_SHORT(value)
 
     def _write_int(self, value: Union[float, int]) -> None:
         """Writes an unsigned integer to the packet"""
-        self._pack(b'!I', int(value))
+        self.data += _PACK_INT(int(value))
 
     def write_string(self, value: bytes) -> None:
         """Writes a string to the packet"""
         assert isinstance(value, bytes)
-        self.data.append(value)
-        self.size += len(value)
-
-    def _write_utf(self, s: str) -> None:
-        """Writes a UTF-8 string of a given length to the packet"""
-        utfstr = s.encode('utf-8')
-        length = len(utfstr)
-        if length > 64:
-            raise NamePartTooLongException
-        self._write_byte(length)
-        self.write_string(utfstr)
+        self.data += value
 
     def write_character_string(self, value: bytes) -> None:
         assert isinstance(value, bytes)
         length = len(value)
         if length > 256:
             raise NamePartTooLongException
-        self._write_byte(length)
-        self.write_string(value)
+        self.data.append(length)
+        self.data += value
 
     def write_name(self, name: str) -> None:
         """
@@ -494,93 +577,81 @@ class DNSOutgoing(DNSMessage):
         earlier in the message [RFC1035].
         """
 
-        # split name into each label
-        parts = name.split('.')
-        if not parts[-1]:
-            parts.pop()
-
-        # construct each suffix
-        name_suffices = ['.'.join(parts[i:]) for i in range(len(parts))]
+        name_suffices, labels, offsets = _encode_name(name)
+        names = self.names
+        data = self.data
 
-        # look for an existing name or suffix
-        for count, sub_name in enumerate(name_suffices):
-            if sub_name in self.names:
+        # look for the longest suffix already in the packet
+        count = 0
+        index = None
+        for sub_name in name_suffices:
+            index = names.get(sub_name)
+            if index is not None:
                 break
-        else:
-            count = len(name_suffices)
+            count += 1
 
         # note the new names we are saving into the packet
-        name_length = len(name.encode('utf-8'))
-        for suffix in name_suffices[:count]:
-            self.names[suffix] = self.size + name_length - len(suffix.encode('utf-8')) - 1
-
-        # write the new names out.
-        for part in parts[:count]:
-            self._write_utf(part)
-
-        # if we wrote part of the name, create a pointer to the rest
-        if count != len(name_suffices):
+        # and write them out.
+        if count:
+            size = len(data)
+            for i in range(count):
+                names[name_suffices[i]] = size + offsets[i]
+            self._names_added.extend(name_suffices[:count])
+            data += labels if index is None else labels[: offsets[count]]
+
+        if index is not None:
             # Found substring in packet, create pointer
-            index = self.names[name_suffices[count]]
-            self._write_byte((index >> 8) | 0xC0)
-            self._write_byte(index & 0xFF)
+            data += _PACK_SHORT(0xC000 | index)
         else:
             # this is the end of a name
-            self._write_byte(0)
+            data.append(0)
 
     def _write_question(self, question: DNSQuestion) -> bool:
         """Writes a question to the packet"""
-        start_data_length, start_size = len(self.data), self.size
+        start_size = len(self.data)
         self.write_name(question.name)
         self.write_short(question.type)
-        self._write_record_class(question)
-        return self._check_data_limit_or_rollback(start_data_length, start_size)
+        self.write_short(self._record_class(question))
+        return self._check_data_limit_or_rollback(start_size)
 
-    def _write_record_class(self, record: Union[DNSQuestion, DNSRecord]) -> None:
-        """Write out the record class including the unique/unicast (QU) bit."""
+    def _record_class(self, record: Union[DNSQuestion, DNSRecord]) -> int:
+        """The record class including the unique/unicast (QU) bit."""
         if record.unique and self.multicast:
-            self.write_short(record.class_ | _CLASS_UNIQUE)
-        else:
-            self.write_short(record.class_)
-
-    def _write_ttl(self, record: DNSRecord, now: float) -> None:
-        """Write out the record ttl."""
-        self._write_int(record.ttl if now == 0 else record.get_remaining_ttl(now))
+            return record.class_ | _CLASS_UNIQUE
+        return record.class_
 
     def _write_record(self, record: DNSRecord, now: float) -> bool:
         """Writes a record (answer, authoritative answer, additional) to
         the packet.  Returns True on success, or False if we did not
         because the packet because the record does not fit."""
-        start_data_length, start_size = len(self.data), self.size
+        start_size = len(self.data)
         self.write_name(record.name)
-        self.write_short(record.type)
-        self._write_record_class(record)
-        self._write_ttl(record, now)
+        ttl = record.ttl if now == 0 else record.get_remaining_ttl(now)
+        self.data += _PACK_RECORD_HEADER(record.type, self._record_class(record), int(ttl), 0)
         index = len(self.data)
-        self.write_short(0)  # Will get replaced with the actual size
         record.write(self)
-        # Adjust size for the short we will write before this record
-        length = sum(len(d) for d in self.data[index + 1 :])
         # Here we replace the 0 length short we wrote
         # before with the actual length
-        self._replace_short(index, length)
-        return self._check_data_limit_or_rollback(start_data_length, start_size)
+        _PACK_SHORT_INTO(self.data, index - 2, len(self.data) - index)
+        return self._check_data_limit_or_rollback(start_size)
 
-    def _check_data_limit_or_rollback(self, start_data_length: int, start_size: int) -> bool:
+    def _check_data_limit_or_rollback(self, start_size: int) -> bool:
         """Check data limit, if we go over, then rollback and return False."""
-        len_limit = _MAX_MSG_ABSOLUTE if self.allow_long else _MAX_MSG_TYPICAL
+        len_limit = _MAX_MSG_ABSOLUTE if self.allow_long else self.max_size
         self.allow_long = False
+        size = len(self.data)
 
-        if self.size <= len_limit:
+        if size <= len_limit:
             return True
 
-        log.debug("Reached data limit (size=%d) > (limit=%d) - rolling back", self.size, len_limit)
-        del self.data[start_data_length:]
-        self.size = start_size
+        log.debug("Reached data limit (size=%d) > (limit=%d) - rolling back", size, len_limit)
+        del self.data[start_size:]
 
-        rollback_names = [name for name, idx in self.names.items() if idx >= start_size]
-        for name in rollback_names:
-            del self.names[name]
+        # Names are added with increasing offsets so the ones
+        # to remove are always at the end
+        names_added = self._names_added
+        while names_added and self.names[names_added[-1]] >= start_size:
+            del self.names[names_added.pop()]
         return False
 
     def _write_questions_from_offset(self, questions_offset: int) -> int:
@@ -626,18 +697,26 @@ class DNSOutgoing(DNSMessage):
             or additional_offset < len(self.additionals)
         )
 
-    def packets(self) -> List[bytes]:
+    def packets(self, max_size: Optional[int] = None) -> List[bytes]:
         """Returns a list of bytestrings containing the packets' bytes
 
         No further parts should be added to the packet once this
-        is done.  The packets are each restricted to _MAX_MSG_TYPICAL
-        or less in length, except for the case of a single answer which
+        is done.  The packets are each restricted to max_size
+        (_MAX_MSG_TYPICAL by default) or less in length, except for the case of a single answer which
         will be written out to a single oversized packet no more than
         _MAX_MSG_ABSOLUTE in length (and hence will be subject to IP
-        fragmentation potentially)."""
+        fragmentation potentially).
+
+        The packets are cached for each max_size so sending the same
+        message on interfaces with the same MTU only writes it once."""
+        if max_size is None:
+            max_size = _MAX_MSG_TYPICAL
+        packets_data = self.packets_data.get(max_size)
+        if packets_data is not None:
+            return packets_data
 
-        if self.state == self.State.finished:
-            return self.packets_data
+        packets_data = self.packets_data[max_size] = []
+        self.max_size = max_size
 
         questions_offset = 0
         answer_offset = 0
@@ -670,11 +749,6 @@ class DNSOutgoing(DNSMessage):
             authorities_written = self._write_authorities_from_offset(authority_offset)
             additionals_written = self._write_additionals_from_offset(additional_offset)
 
-            self._insert_short_at_start(additionals_written)
-            self._insert_short_at_start(authorities_written)
-            self._insert_short_at_start(answers_written)
-            self._insert_short_at_start(questions_written)
-
             questions_offset += questions_written
             answer_offset += answers_written
             authority_offset += authorities_written
@@ -687,21 +761,25 @@ class DNSOutgoing(DNSMessage):
                 additional_offset,
             )
 
+            flags = self.flags
             if self.is_query() and self._has_more_to_add(
                 questions_offset, answer_offset, authority_offset, additional_offset
             ):
                 # https://datatracker.ietf.org/doc/html/rfc6762#section-7.2
                 log.debug("Setting TC flag")
-                self._insert_short_at_start(self.flags | _FLAGS_TC)
-            else:
-                self._insert_short_at_start(self.flags)
-
-            if self.multicast:
-                self._insert_short_at_start(0)
-            else:
-                self._insert_short_at_start(self.id)
-
-            self.packets_data.append(b''.join(self.data))
+                flags |= _FLAGS_TC
+
+            _PACK_HEADER_INTO(
+                self.data,
+                0,
+                0 if self.multicast else self.id,
+                flags,
+                questions_written,
+                answers_written,
+                authorities_written,
+                additionals_written,
+            )
+            packets_data.append(bytes(self.data))
             self._reset_for_next_packet()
 
             if (questions_written + answers_written + authorities_written + additionals_written) == 0 and (
@@ -710,4 +788,4 @@ class DNSOutgoing(DNSMessage):
                 log.warning("packets() made no progress adding records; returning")
                 break
         self.state = self.State.finished
-        return self.packets_data
+        return packets_data
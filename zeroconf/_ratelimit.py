@@ -0,0 +1,96 @@
+""" Multicast DNS Service Discovery for Python, v0.14-wmcbrine
+    Copyright 2003 Paul Scott-Murphy, 2014 William McBrine
+
+    This module provides a framework for the use of DNS Service Discovery
+    using IP multicast.
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation; either
+    version 2.1 of the License, or (at your option) any later version.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301
+    USA
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from ._protocol import DNSIncoming
+from .const import _QUERY_RATE_LIMIT_BURST_SECONDS, _TYPE_ANY
+
+# The maximum number of sources with a partly used bucket.
+# The least recently seen sources are forgotten first.
+_MAX_RATE_LIMITED_SOURCES = 4096
+
+
+class QueryRateLimiter:
+    """Limit how much each source address can make the responder work.
+
+    Every source has a token bucket that refills at rate per second up
+    to burst. A query costs the sum of the costs of its questions so
+    expensive questions such as ANY drain the bucket faster. Queries
+    from a source with an empty bucket are dropped and counted.
+
+    rate and burst must be greater than zero, otherwise ValueError is raised.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        max_sources: int = _MAX_RATE_LIMITED_SOURCES,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError(f"Query rate limit must be greater than zero, got {rate}")
+        if burst is not None and burst <= 0:
+            raise ValueError(f"Query rate limit burst must be greater than zero, got {burst}")
+        self.rate = rate
+        self.burst = burst if burst is not None else rate * _QUERY_RATE_LIMIT_BURST_SECONDS
+        self.question_costs = {_TYPE_ANY: 4.0}
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._max_sources = max_sources
+        self.allowed = 0
+        self.dropped = 0
+
+    def query_cost(self, msgs: List[DNSIncoming]) -> float:
+        """Return the cost of answering a query."""
+        costs = self.question_costs
+        cost = sum(costs.get(question.type, 1.0) for msg in msgs for question in msg.questions)
+        # A query that costs more than the burst is allowed with a full bucket
+        return min(max(cost, 1.0), self.burst)
+
+    def async_allow(self, source: str, msgs: List[DNSIncoming], now: float) -> bool:
+        """Take the cost of a query from the bucket of its source.
+
+        Returns False if the query should be dropped.
+        """
+        buckets = self._buckets
+        tokens, last = buckets.pop(source, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate / 1000)
+        cost = self.query_cost(msgs)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+            self.allowed += 1
+        else:
+            self.dropped += 1
+        buckets[source] = (tokens, now)
+        if len(buckets) > self._max_sources:
+            buckets.popitem(last=False)
+        return allowed
+
+    def async_expire(self, now: float) -> None:
+        """Forget sources whose bucket has refilled."""
+        buckets = self._buckets
+        refill_time = self.burst / self.rate * 1000
+        # Buckets are kept in the order they were last used
+        while buckets and now - next(iter(buckets.values()))[1] >= refill_time:
+            buckets.popitem(last=False)
@@ -21,6 +21,7 @@
 """
 
 import asyncio
+import heapq
 import queue
 import random
 import threading
@@ -57,6 +58,14 @@ from ..const import (
 
 # https://datatracker.ietf.org/doc/html/rfc6762#section-5.2
 _FIRST_QUERY_DELAY_RANDOM_INTERVAL = (20, 120)  # ms
+# Types due this soon are queried early so they can share
+# a packet with the types that are due now. This is the
+# same as the spread of the first query delay so browsers
+# started together send their first queries together.
+_QUERY_ALIGNMENT_WINDOW = 100  # ms
+# The heap of next query times is rebuilt when it
+# holds this many times more entries than types
+_MAX_STALE_HEAP_ENTRIES_FACTOR = 4
 
 _ON_CHANGE_DISPATCH = {
     ServiceStateChange.Added: "add_service",
@@ -69,6 +78,8 @@ if TYPE_CHECKING:
 
 
 _QuestionWithKnownAnswers = Dict[DNSQuestion, Set[DNSPointer]]
+# addr, port, multicast and question type
+_QueryDestination = Tuple[Optional[str], int, bool, Optional[DNSQuestionType]]
 
 
 class _DNSPointerOutgoingBucket:
@@ -185,6 +196,10 @@ class QueryScheduler:
 
     https://datatracker.ietf.org/doc/html/rfc6762#section-5.2
 
+    The next query times are kept in a heap so finding the type due next
+    and rescheduling a type are O(log n) in the number of types. Entries
+    are not removed from the heap when a type is rescheduled, instead they
+    are skipped once they no longer match the type's next time.
     """
 
     def __init__(
@@ -196,8 +211,11 @@ class QueryScheduler:
         self._schedule_changed_event: Optional[asyncio.Event] = None
         self._types = types
         self._next_time: Dict[str, float] = {}
+        self._next_time_heap: List[Tuple[float, str]] = []
         self._first_random_delay_interval = first_random_delay_interval
         self._delay: Dict[str, float] = {check_type_: delay for check_type_ in self._types}
+        # The number of times each type was due to be asked
+        self.queries_sent: Dict[str, int] = {check_type_: 0 for check_type_ in self._types}
 
     def start(self, now: float) -> None:
         """Start the scheduler."""
@@ -214,39 +232,130 @@ class QueryScheduler:
         also delay the first query of the series by a randomly chosen amount
         in the range 20-120 ms.
         """
-        delay = millis_to_seconds(random.randint(*self._first_random_delay_interval))
-        next_time = now + delay
+        next_time = now + random.randint(*self._first_random_delay_interval)
         self._next_time = {check_type_: next_time for check_type_ in self._types}
+        self._next_time_heap = [(next_time, check_type_) for check_type_ in self._types]
+        heapq.heapify(self._next_time_heap)
+
+    def _schedule(self, type_: str, next_time: float) -> None:
+        """Set the next time for a type."""
+        self._next_time[type_] = next_time
+        heap = self._next_time_heap
+        if len(heap) > _MAX_STALE_HEAP_ENTRIES_FACTOR * len(self._next_time):
+            # Too many entries are stale, rebuild the heap without them
+            heap[:] = [(next_time_, type__) for type__, next_time_ in self._next_time.items()]
+            heapq.heapify(heap)
+        else:
+            heapq.heappush(heap, (next_time, type_))
+
+    def _first_due(self) -> Tuple[float, str]:
+        """Return the next time and type that is due first."""
+        heap = self._next_time_heap
+        next_time = self._next_time
+        while heap[0][0] != next_time[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0]
 
     def millis_to_wait(self, now: float) -> float:
         """Returns the number of milliseconds to wait for the next event."""
         # Wait for the type has the smallest next time
-        next_time = min(self._next_time.values())
+        next_time = self._first_due()[0]
         return 0 if next_time <= now else next_time - now
 
     def reschedule_type(self, type_: str, next_time: float) -> bool:
         """Reschedule the query for a type to happen sooner."""
         if next_time >= self._next_time[type_]:
             return False
-        self._next_time[type_] = next_time
+        self._schedule(type_, next_time)
         return True
 
-    def process_ready_types(self, now: float) -> List[str]:
-        """Generate a list of ready types that is due and schedule the next time."""
-        if self.millis_to_wait(now):
+    def process_ready_types(self, now: float, window: float = 0) -> List[str]:
+        """Generate a list of ready types that is due and schedule the next time.
+
+        Types due within window of now are also considered ready.
+        """
+        if self.millis_to_wait(now) > window:
             return []
 
-        ready_types: List[str] = []
+        ready_types: Dict[str, None] = {}
+        heap = self._next_time_heap
+        while heap and heap[0][0] <= now + window:
+            due, type_ = heapq.heappop(heap)
+            if due == self._next_time[type_]:
+                ready_types[type_] = None
+
+        for type_ in ready_types:
+            self.queries_sent[type_] += 1
+            self._schedule(type_, now + self._delay[type_])
+            self._delay[type_] = min(_BROWSER_BACKOFF_LIMIT * 1000, self._delay[type_] * 2)
+
+        return list(ready_types)
+
+
+class SharedQueryScheduler:
+    """Send the queries of all the browsers of a Zeroconf instance together.
+
+    Each browser keeps its own QueryScheduler so every type backs off on
+    its own. When any type is due, the types of every browser that are due
+    or nearly due are asked together in as few packets as possible.
+    """
+
+    def __init__(self, zc: 'Zeroconf') -> None:
+        self.zc = zc
+        self._browsers: Dict['_ServiceBrowserBase', None] = {}
+        self._next_send_timer: Optional[asyncio.TimerHandle] = None
+
+    def async_add_browser(self, browser: '_ServiceBrowserBase') -> None:
+        """Start sending the queries of a browser."""
+        self._browsers[browser] = None
+        self.async_send_ready_queries_schedule_next()
+
+    def async_remove_browser(self, browser: '_ServiceBrowserBase') -> None:
+        """Stop sending the queries of a browser."""
+        self._browsers.pop(browser, None)
+        self.async_schedule_next()
+
+    def async_send_ready_queries(self) -> None:
+        """Send the queries for every type that is due."""
+        if self.zc.done:
+            return
+        now = current_time_millis()
+        if all(browser.query_scheduler.millis_to_wait(now) for browser in self._browsers):
+            return
 
-        for type_, due in self._next_time.items():
-            if due > now:
+        # Browsers asking the same kind of question to the same
+        # destination share packets
+        types_by_destination: Dict[_QueryDestination, Dict[str, None]] = {}
+        for browser in self._browsers:
+            ready_types = browser.query_scheduler.process_ready_types(now, _QUERY_ALIGNMENT_WINDOW)
+            if not ready_types:
                 continue
+            question_type = browser.async_consume_question_type()
+            destination = (browser.addr, browser.port, browser.multicast, question_type)
+            types_by_destination.setdefault(destination, {}).update(dict.fromkeys(ready_types))
 
-            ready_types.append(type_)
-            self._next_time[type_] = now + self._delay[type_]
-            self._delay[type_] = min(_BROWSER_BACKOFF_LIMIT * 1000, self._delay[type_] * 2)
+        for (addr, port, multicast, question_type), types in types_by_destination.items():
+            for out in generate_service_query(self.zc, now, list(types), multicast, question_type):
+                self.zc.async_send(out, addr=addr, port=port)
+
+    def async_schedule_next(self) -> None:
+        """Schedule the next send for when the first type is due."""
+        assert self.zc.loop is not None
+        if self._next_send_timer:
+            self._next_send_timer.cancel()
+            self._next_send_timer = None
+        if not self._browsers or self.zc.done:
+            return
+        now = current_time_millis()
+        millis_to_wait = min(browser.query_scheduler.millis_to_wait(now) for browser in self._browsers)
+        self._next_send_timer = self.zc.loop.call_later(
+            millis_to_seconds(millis_to_wait), self.async_send_ready_queries_schedule_next
+        )
 
-        return ready_types
+    def async_send_ready_queries_schedule_next(self) -> None:
+        """Send ready queries and schedule next one."""
+        self.async_send_ready_queries()
+        self.async_schedule_next()
 
 
 class _ServiceBrowserBase(RecordUpdateListener):
@@ -296,7 +405,6 @@ class _ServiceBrowserBase(RecordUpdateListener):
         self.queue: Optional[queue.Queue] = None
         self.done = False
         self._first_request: bool = True
-        self._next_send_timer: Optional[asyncio.TimerHandle] = None
 
         if hasattr(handlers, 'add_service'):
             listener = cast('ServiceListener', handlers)
@@ -321,6 +429,21 @@ class _ServiceBrowserBase(RecordUpdateListener):
         # Only start queries after the listener is installed
         asyncio.ensure_future(self._async_start_query_sender())
 
+    def async_consume_question_type(self) -> Optional[DNSQuestionType]:
+        """Return the question type to use for the queries being sent now.
+
+        This function must be run in the event loop.
+        """
+        question_type = self.question_type
+        # If they did not specify and this is the first request, ask QU questions
+        # https://datatracker.ietf.org/doc/html/rfc6762#section-5.4 since we are
+        # just starting up and we know our cache is likely empty. This ensures
+        # the next outgoing will be sent with the known answers list.
+        if not question_type and self._first_request:
+            question_type = DNSQuestionType.QU
+        self._first_request = False
+        return question_type
+
     @property
     def service_state_changed(self) -> SignalRegistrationInterface:
         return self._service_state_changed.registration_interface
@@ -430,62 +553,25 @@ class _ServiceBrowserBase(RecordUpdateListener):
     def _async_cancel(self) -> None:
         """Cancel the browser."""
         self.done = True
-        self._cancel_send_timer()
+        self.zc.browser_query_scheduler.async_remove_browser(self)
         self.zc.async_remove_listener(self)
 
-    def _generate_ready_queries(self, first_request: bool) -> List[DNSOutgoing]:
-        """Generate the service browser query for any type that is due."""
-        now = current_time_millis()
-        ready_types = self.query_scheduler.process_ready_types(now)
-        if not ready_types:
-            return []
-
-        # If they did not specify and this is the first request, ask QU questions
-        # https://datatracker.ietf.org/doc/html/rfc6762#section-5.4 since we are
-        # just starting up and we know our cache is likely empty. This ensures
-        # the next outgoing will be sent with the known answers list.
-        question_type = DNSQuestionType.QU if not self.question_type and first_request else self.question_type
-        return generate_service_query(self.zc, now, ready_types, self.multicast, question_type)
-
     async def _async_start_query_sender(self) -> None:
         """Start scheduling queries."""
         await self.zc.async_wait_for_start()
-        self._async_send_ready_queries()
-        self._async_schedule_next()
-
-    def _cancel_send_timer(self) -> None:
-        """Cancel the next send."""
-        if self._next_send_timer:
-            self._next_send_timer.cancel()
+        if not self.done:
+            self.zc.browser_query_scheduler.async_add_browser(self)
 
     def reschedule_type(self, type_: str, next_time: float) -> None:
         """Reschedule a type to be refreshed in the future."""
         if self.query_scheduler.reschedule_type(type_, next_time):
-            self._cancel_send_timer()
-            self._async_schedule_next()
-        self._async_send_ready_queries()
-
-    def _async_send_ready_queries(self) -> None:
-        """Send any ready queries."""
-        if self.done or self.zc.done:
-            return
-
-        outs = self._generate_ready_queries(self._first_request)
-        if outs:
-            self._first_request = False
-            for out in outs:
-                self.zc.async_send(out, addr=self.addr, port=self.port)
+            self.zc.browser_query_scheduler.async_schedule_next()
+        if not self.query_scheduler.millis_to_wait(current_time_millis()):
+            self.zc.browser_query_scheduler.async_send_ready_queries()
 
     def _async_send_ready_queries_schedule_next(self) -> None:
         """Send ready queries and schedule next one."""
-        self._async_send_ready_queries()
-        self._async_schedule_next()
-
-    def _async_schedule_next(self) -> None:
-        """Scheule the next time."""
-        assert self.zc.loop is not None
-        delay = millis_to_seconds(self.query_scheduler.millis_to_wait(current_time_millis()))
-        self._next_send_timer = self.zc.loop.call_later(delay, self._async_send_ready_queries_schedule_next)
+        self.zc.browser_query_scheduler.async_send_ready_queries_schedule_next()
 
 
 class ServiceBrowser(_ServiceBrowserBase, threading.Thread):
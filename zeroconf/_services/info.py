@@ -451,6 +451,8 @@ class ServiceInfo(RecordUpdateListener):
         next_ = now
         last = now + timeout
         await zc.async_wait_for_start()
+        interests = [self.name, self.server]
+        zc.record_manager.async_add_interest(interests)
         try:
             zc.async_add_listener(self, None)
             while not self._is_complete:
@@ -472,6 +474,7 @@ class ServiceInfo(RecordUpdateListener):
                 now = current_time_millis()
         finally:
             zc.async_remove_listener(self)
+            zc.record_manager.async_remove_interest(interests)
 
         return True
 
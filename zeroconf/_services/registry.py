@@ -20,11 +20,59 @@
     USA
 """
 
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Set, Union
 
 
 from .info import ServiceInfo
+from .._dns import DNSRecord, construct_nsec_record
 from .._exceptions import ServiceNameAlreadyRegistered
+from ..const import _TYPE_A, _TYPE_AAAA
+
+_ADDRESS_RECORD_TYPES = {_TYPE_A, _TYPE_AAAA}
+
+
+class ServiceRecords:
+    """The records used to answer questions about a registered service.
+
+    They are built once when the service is added to the registry so
+    answering a question is a lookup. The records and sets are shared
+    between responses and must not be modified.
+    """
+
+    __slots__ = (
+        'info',
+        'type_key',
+        'server_key',
+        'pointer',
+        'service',
+        'text',
+        'addresses',
+        'nsec',
+        'pointer_additionals',
+        'service_additionals',
+    )
+
+    def __init__(self, info: ServiceInfo) -> None:
+        """Build the records for a ServiceInfo."""
+        self.info = info
+        # The index keys are kept so the service can be removed
+        # from the indexes even if the info has since been changed
+        self.type_key = info.type.lower()
+        self.server_key = info.server.lower()
+        self.pointer = info.dns_pointer()
+        self.service = info.dns_service()
+        self.text = info.dns_text()
+        self.addresses = info.dns_addresses()
+        # NSEC records for the address types the service does not have
+        missing_types = _ADDRESS_RECORD_TYPES - {dns_address.type for dns_address in self.addresses}
+        self.nsec = construct_nsec_record(info.server, list(missing_types)) if missing_types else None
+        self.service_additionals: Set[DNSRecord] = set(self.addresses)
+        if self.nsec:
+            self.service_additionals.add(self.nsec)
+        self.pointer_additionals: Set[DNSRecord] = {self.service, self.text, *self.service_additionals}
+
+
+_EMPTY_INDEX: Dict[str, ServiceRecords] = {}
 
 
 class ServiceRegistry:
@@ -38,13 +86,27 @@ class ServiceRegistry:
         self,
     ) -> None:
         """Create the ServiceRegistry class."""
-        self._services: Dict[str, ServiceInfo] = {}
-        self.types: Dict[str, List] = {}
-        self.servers: Dict[str, List] = {}
-
-    def async_add(self, info: ServiceInfo) -> None:
-        """Add a new service to the registry."""
-        self._add(info)
+        self._services: Dict[str, ServiceRecords] = {}
+        # The indexes map a lower case type or server to the services
+        # under it keyed by name so adding and removing are O(1).
+        # Empty entries are removed so a missing key means there is
+        # nothing registered for the name.
+        self.types: Dict[str, Dict[str, ServiceRecords]] = {}
+        self.servers: Dict[str, Dict[str, ServiceRecords]] = {}
+
+    def async_add(self, info: Union[List[ServiceInfo], ServiceInfo]) -> None:
+        """Add new services to the registry.
+
+        If any of the names is already registered, or is in the list
+        more than once, ServiceNameAlreadyRegistered is raised and
+        none of the services are added.
+        """
+        infos = info if isinstance(info, list) else [info]
+        keys = {service.key for service in infos}
+        if len(keys) != len(infos) or not keys.isdisjoint(self._services):
+            raise ServiceNameAlreadyRegistered
+        for service in infos:
+            self._add(service)
 
     def async_remove(self, info: Union[List[ServiceInfo], ServiceInfo]) -> None:
         """Remove a new service from the registry."""
@@ -57,11 +119,12 @@ class ServiceRegistry:
 
     def async_get_service_infos(self) -> List[ServiceInfo]:
         """Return all ServiceInfo."""
-        return list(self._services.values())
+        return [records.info for records in self._services.values()]
 
     def async_get_info_name(self, name: str) -> Optional[ServiceInfo]:
         """Return all ServiceInfo for the name."""
-        return self._services.get(name.lower())
+        records = self._services.get(name.lower())
+        return records.info if records else None
 
     def async_get_types(self) -> List[str]:
         """Return all types."""
@@ -69,31 +132,52 @@ class ServiceRegistry:
 
     def async_get_infos_type(self, type_: str) -> List[ServiceInfo]:
         """Return all ServiceInfo matching type."""
-        return self._async_get_by_index("types", type_)
+        return [records.info for records in self.async_get_records_type(type_)]
 
     def async_get_infos_server(self, server: str) -> List[ServiceInfo]:
         """Return all ServiceInfo matching server."""
-        return self._async_get_by_index("servers", server)
+        return [records.info for records in self.async_get_records_server(server)]
+
+    def async_has_name(self, name: str) -> bool:
+        """Return True if a registered service has records for the name."""
+        key = name.lower()
+        return key in self._services or key in self.types or key in self.servers
+
+    def async_get_records_name(self, name: str) -> Optional[ServiceRecords]:
+        """Return the ServiceRecords for the name."""
+        return self._services.get(name.lower())
+
+    def async_get_records_type(self, type_: str) -> Iterable[ServiceRecords]:
+        """Return all ServiceRecords matching type."""
+        return self.types.get(type_.lower(), _EMPTY_INDEX).values()
 
-    def _async_get_by_index(self, attr: str, key: str) -> List[ServiceInfo]:
-        """Return all ServiceInfo matching the index."""
-        return [self._services[name] for name in getattr(self, attr).get(key.lower(), [])]
+    def async_get_records_server(self, server: str) -> Iterable[ServiceRecords]:
+        """Return all ServiceRecords matching server."""
+        return self.servers.get(server.lower(), _EMPTY_INDEX).values()
 
     def _add(self, info: ServiceInfo) -> None:
         """Add a new service under the lock."""
         if info.key in self._services:
             raise ServiceNameAlreadyRegistered
 
-        self._services[info.key] = info
-        self.types.setdefault(info.type.lower(), []).append(info.key)
-        self.servers.setdefault(info.server_key, []).append(info.key)
+        records = ServiceRecords(info)
+        self._services[info.key] = records
+        self.types.setdefault(records.type_key, {})[info.key] = records
+        self.servers.setdefault(records.server_key, {})[info.key] = records
 
     def _remove(self, infos: List[ServiceInfo]) -> None:
         """Remove a services under the lock."""
         for info in infos:
-            if info.key not in self._services:
+            records = self._services.pop(info.key, None)
+            if records is None:
                 continue
-            old_service_info = self._services[info.key]
-            self.types[old_service_info.type.lower()].remove(info.key)
-            self.servers[old_service_info.server_key].remove(info.key)
-            del self._services[info.key]
+            _remove_from_index(self.types, records.type_key, info.key)
+            _remove_from_index(self.servers, records.server_key, info.key)
+
+
+def _remove_from_index(index: Dict[str, Dict[str, ServiceRecords]], index_key: str, key: str) -> None:
+    """Remove a service from an index and drop the entry once it is empty."""
+    services = index[index_key]
+    del services[key]
+    if not services:
+        del index[index_key]
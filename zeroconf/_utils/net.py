@@ -31,7 +31,12 @@ from typing import Any, List, Optional, Tuple, Union, cast
 import ifaddr
 
 from .._logger import log
-from ..const import _IPPROTO_IPV6, _MDNS_ADDR, _MDNS_ADDR6, _MDNS_PORT
+from ..const import _IPPROTO_IPV6, _MAX_MSG_ABSOLUTE, _MAX_MSG_TYPICAL, _MDNS_ADDR, _MDNS_ADDR6, _MDNS_PORT
+
+_SIOCGIFMTU = 0x8921  # Linux only
+_IFREQ_LEN = 40
+_IPV4_UDP_HEADER_LEN = 20 + 8
+_IPV6_UDP_HEADER_LEN = 40 + 8
 
 
 @enum.unique
@@ -374,6 +379,47 @@ def create_sockets(
     return listen_socket, respond_sockets
 
 
+def _multicast_interface_name(sock: socket.socket) -> Optional[str]:
+    """Return the name of the interface a socket sends multicast on."""
+    if sock.family == socket.AF_INET6:
+        index = struct.unpack('@I', sock.getsockopt(_IPPROTO_IPV6, socket.IPV6_MULTICAST_IF, 4))[0]
+        return socket.if_indextoname(index) if index else None
+    address = socket.inet_ntoa(sock.getsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, 4))
+    for adapter in ifaddr.get_adapters():
+        if any(ip.ip == address for ip in adapter.ips):
+            return cast(str, adapter.name)
+    return None
+
+
+def get_interface_mtu(sock: socket.socket) -> Optional[int]:
+    """Return the MTU of the interface a socket sends multicast on if it can be found.
+
+    This is only implemented on Linux.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    import fcntl  # pylint: disable=import-outside-toplevel
+
+    try:
+        name = _multicast_interface_name(sock)
+        if name is None:
+            return None
+        ifreq = struct.pack(f'{_IFREQ_LEN}s', name.encode('utf-8'))
+        return cast(int, struct.unpack_from('@i', fcntl.ioctl(sock.fileno(), _SIOCGIFMTU, ifreq), 16)[0])
+    except OSError as err:
+        log.debug('Unable to get the MTU of the interface for %s: %s', sock, err)
+        return None
+
+
+def get_max_packet_size(sock: socket.socket) -> int:
+    """Return the largest mDNS packet that can be sent on a socket without IP fragmentation."""
+    mtu = get_interface_mtu(sock)
+    if mtu is None:
+        return _MAX_MSG_TYPICAL
+    header_len = _IPV6_UDP_HEADER_LEN if sock.family == socket.AF_INET6 else _IPV4_UDP_HEADER_LEN
+    return min(mtu - header_len, _MAX_MSG_ABSOLUTE)
+
+
 def get_errno(e: Exception) -> int:
     assert isinstance(e, socket.error)
     return cast(int, e.args[0])
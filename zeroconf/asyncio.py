@@ -143,6 +143,9 @@ class AsyncZeroconf:
         ip_version: Optional[IPVersion] = None,
         apple_p2p: bool = False,
         zc: Optional[Zeroconf] = None,
+        interest_filter: bool = False,
+        query_rate_limit: Optional[float] = None,
+        cache_max_records: Optional[int] = None,
     ) -> None:
         """Creates an instance of the Zeroconf class, establishing
         multicast communications, listening and reaping threads.
@@ -158,12 +161,21 @@ class AsyncZeroconf:
         :param ip_version: IP versions to support. If `choice` is a list, the default is detected
             from it. Otherwise defaults to V4 only for backward compatibility.
         :param apple_p2p: use AWDL interface (only macOS)
+        :param interest_filter: only cache records that browsers, listeners
+            or registered services are interested in
+        :param query_rate_limit: the cost of queries answered per second
+            for each source address, or None to answer every query.
+            Raises ValueError if it is not greater than zero
+        :param cache_max_records: the most records to cache, or None for no limit
         """
         self.zeroconf = zc or Zeroconf(
             interfaces=interfaces,
             unicast=unicast,
             ip_version=ip_version,
             apple_p2p=apple_p2p,
+            interest_filter=interest_filter,
+            query_rate_limit=query_rate_limit,
+            cache_max_records=cache_max_records,
         )
         self.async_browsers: Dict[ServiceListener, AsyncServiceBrowser] = {}
 
@@ -188,6 +200,23 @@ class AsyncZeroconf:
             info, ttl, allow_name_change, cooperating_responders
         )
 
+    async def async_register_services(
+        self,
+        infos: List[ServiceInfo],
+        ttl: Optional[int] = None,
+        allow_name_change: bool = False,
+        cooperating_responders: bool = False,
+    ) -> Awaitable:
+        """Registers many services at once, probing for and announcing
+        all of them together.
+
+        The services will be broadcast in a task. This task is returned
+        and therefore can be awaited if necessary.
+        """
+        return await self.zeroconf.async_register_services(
+            infos, ttl, allow_name_change, cooperating_responders
+        )
+
     async def async_unregister_all_services(self) -> None:
         """Unregister all registered services.
 
@@ -205,6 +234,15 @@ class AsyncZeroconf:
         """
         return await self.zeroconf.async_unregister_service(info)
 
+    async def async_unregister_services(self, infos: List[ServiceInfo]) -> Awaitable:
+        """Unregister many services at once, packing their goodbyes
+        into as few packets as possible.
+
+        The goodbyes will be broadcast in a task. This task is returned
+        and therefore can be awaited if necessary.
+        """
+        return await self.zeroconf.async_unregister_services(infos)
+
     async def async_update_service(self, info: ServiceInfo) -> Awaitable:
         """Registers service information to the network with a default TTL.
         Zeroconf will then respond to requests for information for that
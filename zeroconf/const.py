@@ -31,10 +31,12 @@ _REGISTER_TIME = 225  # ms
 _LISTENER_TIME = 200  # ms
 _BROWSER_TIME = 1000  # ms
 _DUPLICATE_QUESTION_INTERVAL = _BROWSER_TIME - 1  # ms
+_DUPLICATE_PACKET_SUPPRESSION_INTERVAL = 1000  # ms
 _BROWSER_BACKOFF_LIMIT = 3600  # s
 _CACHE_CLEANUP_INTERVAL = 10000  # ms
 _LOADED_SYSTEM_TIMEOUT = 10  # s
 _ONE_SECOND = 1000  # ms
+_QUERY_RATE_LIMIT_BURST_SECONDS = 5  # s
 
 # If the system is loaded or the event
 # loop was blocked by another task that was doing I/O in the loop
@@ -58,7 +60,7 @@ _DNS_PTR_MIN_TTL = _DNS_OTHER_TTL / 4
 
 _DNS_PACKET_HEADER_LEN = 12
 
-_MAX_MSG_TYPICAL = 1460  # unused
+_MAX_MSG_TYPICAL = 1460
 _MAX_MSG_ABSOLUTE = 8966
 
 _FLAGS_QR_MASK = 0x8000  # query response mask